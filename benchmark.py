@@ -1,15 +1,19 @@
 from __future__ import annotations
 
 import csv
+import io
 import json
 import os
 import random
 import time
-from typing import Iterable, List
+from typing import Any, Callable, Container, Iterable, Iterator, List, Mapping, Tuple
 
-from datasets import available_datasets, generate
+import results_store
+from cachesim import CacheConfig, CacheSink
+from datasets import available_datasets, element_key, generate
 from instrumentation import Instrumentation
-from sorts import ALGORITHMS
+from presortedness import measure
+from sorts import ALGORITHMS, odd_even, parallel, supports
 from sorts.gaps import available_variants
 
 
@@ -34,6 +38,219 @@ def _build_seed_map(
     return seeds
 
 
+Cell = Tuple[str, str, str, str, int, int]
+
+FIELD_TYPES: dict[str, Callable[[str], object]] = {
+    "algorithm": str,
+    "gap_variant": str,
+    "n": int,
+    "dataset": str,
+    "element_type": str,
+    "trial": int,
+    "seed": int,
+    "time_ms": float,
+    "comparisons": int,
+    "swaps": int,
+    "writes": int,
+}
+
+# Relative cost of one cell, fitted to the n=1000 random timings in the README.
+# The odd_even entry is its per-element Python path.
+_COST_MODELS: dict[str, Callable[[int], float]] = {
+    "auto": lambda n: 10.0 * n**1.25,
+    "bubble": lambda n: 1.7 * n * n,
+    "external": lambda n: 12.0 * n**1.25,
+    "insertion": lambda n: 1.0 * n * n,
+    "odd_even": lambda n: 1.7 * n * n,
+    "selection": lambda n: 1.0 * n * n,
+    "parallel": lambda n: 10.0 * n**1.25,
+    "shell": lambda n: 10.0 * n**1.25,
+}
+
+# With NumPy, odd_even runs int/float cells one vectorized step per phase:
+# about 65 ms at n=5000 random, so far below bubble and close to shell.
+_NUMPY_COST_MODELS: dict[str, Callable[[int], float]] = {
+    "odd_even": lambda n: 0.025 * n * n,
+}
+_NUMPY_ELEMENT_TYPES = frozenset({"int", "float"})
+
+# Algorithms whose rows are expanded over the shell gap variants.
+GAP_ALGORITHMS = frozenset({"shell"})
+# Algorithms that hand gap_variant to their chunk kernel (shell by default),
+# so they are expanded only when that kernel uses gaps.
+CHUNKED_ALGORITHMS = frozenset({"parallel", "external"})
+
+# Comparison cost of each element type relative to int.
+_ELEMENT_COST = {"int": 1.0, "float": 1.0, "str": 1.5, "record": 2.0}
+
+
+def iter_cells(
+    algorithms: Iterable[str],
+    sizes: Iterable[int],
+    datasets: Iterable[str],
+    trials: int,
+    gap_variants: Iterable[str] | None = None,
+    element_types: Iterable[str] | None = None,
+    kernel: str | None = None,
+) -> Iterator[Cell]:
+    """Yield (algorithm, gap_variant, dataset, element_type, n, trial) in serial run order.
+
+    Element types an algorithm does not support (see ``sorts.ELEMENT_TYPES``) are left out.
+    """
+    sizes = list(sizes)
+    datasets = list(datasets)
+    gap_variants = list(gap_variants or available_variants())
+    element_types = list(element_types or ["int"])
+    for algo in algorithms:
+        if algo not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algo}")
+        variants = gap_variants if _uses_gaps(algo, kernel) else [""]
+        for variant in variants:
+            for element_type in element_types:
+                if not supports(algo, element_type):
+                    continue
+                for dataset in datasets:
+                    for n in sizes:
+                        for trial in range(1, trials + 1):
+                            yield (algo, variant, dataset, element_type, n, trial)
+
+
+def _uses_gaps(algo: str, kernel: str | None) -> bool:
+    if algo in CHUNKED_ALGORITHMS:
+        return (kernel or "shell") in GAP_ALGORITHMS
+    return algo in GAP_ALGORITHMS
+
+
+def estimate_cost(algorithm: str, n: int, element_type: str = "int") -> float:
+    model = _COST_MODELS.get(algorithm)
+    if (
+        algorithm in _NUMPY_COST_MODELS
+        and element_type in _NUMPY_ELEMENT_TYPES
+        and odd_even._numpy() is not None
+    ):
+        model = _NUMPY_COST_MODELS[algorithm]
+    cost = float(n * n) if model is None else model(n)
+    return cost * _ELEMENT_COST.get(element_type, 1.0)
+
+
+def _cell_cost(cell: Cell) -> float:
+    algo, _, _, element_type, n, _ = cell
+    return estimate_cost(algo, n, element_type)
+
+
+def parse_shard(spec: str) -> tuple[int, int]:
+    """Parse an ``i/k`` shard spec (1-based index) into ``(i, k)``."""
+    try:
+        index_text, count_text = spec.split("/")
+        index, count = int(index_text), int(count_text)
+    except ValueError as exc:
+        raise ValueError(f"Invalid shard spec {spec!r}, expected i/k") from exc
+    if count < 1 or not 1 <= index <= count:
+        raise ValueError(f"Invalid shard spec {spec!r}, need 1 <= i <= k")
+    return index, count
+
+
+def shard_cells(cells: Iterable[Cell], index: int, count: int) -> List[Cell]:
+    """Return shard ``index`` of ``count`` cost-balanced, disjoint shards.
+
+    Cells are assigned greedily, most expensive first, to the least loaded
+    shard. Ties break on grid position and shard number, so every machine
+    computes the same partition. The returned cells keep serial run order.
+    """
+    ordered = list(cells)
+    by_cost = sorted(
+        range(len(ordered)),
+        key=lambda pos: (-_cell_cost(ordered[pos]), pos),
+    )
+    loads = [0.0] * count
+    owner = [0] * len(ordered)
+    for pos in by_cost:
+        target = min(range(count), key=lambda shard: (loads[shard], shard))
+        loads[target] += _cell_cost(ordered[pos])
+        owner[pos] = target
+    return [cell for pos, cell in enumerate(ordered) if owner[pos] == index - 1]
+
+
+def iter_benchmarks(
+    algorithms: Iterable[str],
+    sizes: Iterable[int],
+    datasets: Iterable[str],
+    trials: int,
+    base_seed: int,
+    gap_variants: Iterable[str] | None = None,
+    generate_fn: Callable[..., List[Any]] = generate,
+    shard: tuple[int, int] | None = None,
+    element_types: Iterable[str] | None = None,
+    skip: Container[tuple[object, ...]] = (),
+    cache: CacheConfig | None = None,
+    workers: int | None = None,
+    probe: bool = False,
+    kernel: str | None = None,
+    kernel_options: Mapping[str, object] | None = None,
+) -> Iterator[dict[str, object]]:
+    """Yield one result row per benchmark cell as soon as it completes.
+
+    Cells whose :func:`result_key` is in ``skip`` are not run; the optional
+    extra columns are described in the README.
+    """
+    sizes = list(sizes)
+    datasets = list(datasets)
+    cells: Iterable[Cell] = iter_cells(
+        algorithms, sizes, datasets, trials, gap_variants, element_types, kernel
+    )
+    if shard is not None:
+        cells = shard_cells(cells, *shard)
+
+    # Seeds always come from the full grid so shards reproduce the serial run.
+    seed_map = _build_seed_map(datasets, sizes, trials, base_seed)
+    options = dict(kernel_options or {}, workers=workers)
+    if kernel is not None:
+        options["kernel"] = kernel
+
+    for algo, variant, dataset, element_type, n, trial in cells:
+        seed = seed_map[(dataset, n, trial)]
+        if (algo, variant, dataset, element_type, n, trial, seed) in skip:
+            continue
+        base_data = generate_fn(dataset, n, seed, element_type)
+        data = list(base_data)
+        key = element_key(element_type)
+        # Keep one-off start-up costs out of the first timed trial.
+        if algo == "parallel":
+            parallel.start_pool(workers)
+        elif algo == "odd_even":
+            odd_even.warm_up()
+        inst = Instrumentation()
+        start = time.perf_counter()
+        ALGORITHMS[algo](data, inst, gap_variant=variant, key=key, **options)
+        elapsed_ms = (time.perf_counter() - start) * 1000
+
+        row: dict[str, object] = {
+            "algorithm": algo,
+            "gap_variant": variant,
+            "n": n,
+            "dataset": dataset,
+            "element_type": element_type,
+            "trial": trial,
+            "seed": seed,
+            "time_ms": round(elapsed_ms, 4),
+            "comparisons": inst.comparisons,
+            "swaps": inst.swaps,
+            "writes": inst.writes,
+            **inst.stats,
+        }
+        if probe:
+            row.update(measure(base_data, key=key).as_row())
+        if cache is not None:
+            sink = CacheSink(cache)
+            traced = Instrumentation(event_sink=sink)
+            ALGORITHMS[algo](list(base_data), traced, gap_variant=variant, key=key, **options)
+            # Work done without events (external's runs, parallel's merge)
+            # would be missing from the model; leave the columns empty then.
+            if sink.covers(traced):
+                row.update(sink.stats())
+        yield row
+
+
 def run_benchmarks(
     algorithms: Iterable[str],
     sizes: Iterable[int],
@@ -41,71 +258,349 @@ def run_benchmarks(
     trials: int,
     base_seed: int,
     gap_variants: Iterable[str] | None = None,
+    shard: tuple[int, int] | None = None,
+    element_types: Iterable[str] | None = None,
+    cache: CacheConfig | None = None,
+    workers: int | None = None,
+    probe: bool = False,
+    kernel: str | None = None,
+    kernel_options: Mapping[str, object] | None = None,
 ) -> List[dict[str, object]]:
-    results: List[dict[str, object]] = []
-    gap_variants = list(gap_variants or available_variants())
+    return list(
+        iter_benchmarks(
+            algorithms=algorithms,
+            sizes=sizes,
+            datasets=datasets,
+            trials=trials,
+            base_seed=base_seed,
+            gap_variants=gap_variants,
+            shard=shard,
+            element_types=element_types,
+            cache=cache,
+            workers=workers,
+            probe=probe,
+            kernel=kernel,
+            kernel_options=kernel_options,
+        )
+    )
 
-    seed_map = _build_seed_map(datasets, sizes, trials, base_seed)
 
-    for algo in algorithms:
-        if algo not in ALGORITHMS:
-            raise ValueError(f"Unknown algorithm: {algo}")
-        algo_fn = ALGORITHMS[algo]
-        variants = gap_variants if algo == "shell" else [""]
+def result_key(row: dict[str, object]) -> tuple[object, ...]:
+    """Identity of a completed cell, used to skip it when resuming."""
+    return (*_row_cell(row), int(row["seed"]))  # type: ignore[arg-type]
 
-        for variant in variants:
-            for dataset in datasets:
-                for n in sizes:
-                    for trial in range(1, trials + 1):
-                        seed = seed_map[(dataset, n, trial)]
-                        base_data = generate(dataset, n, seed)
-                        data = list(base_data)
-                        inst = Instrumentation()
-                        start = time.perf_counter()
-                        algo_fn(data, inst, gap_variant=variant)
-                        elapsed_ms = (time.perf_counter() - start) * 1000
-
-                        results.append(
-                            {
-                                "algorithm": algo,
-                                "gap_variant": variant,
-                                "n": n,
-                                "dataset": dataset,
-                                "trial": trial,
-                                "seed": seed,
-                                "time_ms": round(elapsed_ms, 4),
-                                "comparisons": inst.comparisons,
-                                "swaps": inst.swaps,
-                                "writes": inst.writes,
-                            }
-                        )
-    return results
-
-
-def write_results(path: str, rows: List[dict[str, object]]) -> None:
-    _ensure_output_dir(path)
-    if path.lower().endswith(".json"):
-        with open(path, "w", encoding="utf-8") as handle:
-            json.dump(rows, handle, indent=2)
+
+def _fsync_dir(path: str) -> None:
+    """Persist a rename of ``path``; not every platform can fsync a directory."""
+    try:
+        fd = os.open(os.path.dirname(path) or ".", os.O_RDONLY)
+    except OSError:
         return
+    try:
+        os.fsync(fd)
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+def _format(path: str) -> str:
+    lower = path.lower()
+    if lower.endswith(".jsonl"):
+        return "jsonl"
+    if lower.endswith(".json"):
+        return "json"
+    if lower.endswith(".cols"):
+        return "cols"
+    return "csv"
+
+
+class ResultWriter:
+    """Stream result rows to CSV, JSON, JSONL or columnar files as they complete.
+
+    Each row is flushed as soon as it is written and the file is fsynced every
+    ``fsync_every`` rows or ``fsync_interval`` seconds, so an interrupted
+    sweep keeps everything it finished. JSON output is written as an array
+    with one row per line; closing the writer terminates the array. Columnar
+    (``.cols``) output is checkpointed to ``<path>.partial.jsonl`` and
+    converted when the writer closes.
+
+    With ``resume=True`` the rows already in ``path`` are kept (a torn final
+    row is dropped) and their keys are exposed as :attr:`completed`.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        resume: bool = False,
+        fsync_every: int = 50,
+        fsync_interval: float = 5.0,
+    ) -> None:
+        self.path = path
+        self.fsync_every = fsync_every
+        self.fsync_interval = fsync_interval
+        self.rows_written = 0
+        self.completed: set[tuple[object, ...]] = set()
+        self._columnar = _format(path) == "cols"
+        self._format = "jsonl" if self._columnar else _format(path)
+        self._stream_path = path + ".partial.jsonl" if self._columnar else path
+        self._fieldnames: List[str] = []
+        self._csv: csv.DictWriter | None = None
+        self._handle = None
+        self._count = 0
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+        _ensure_output_dir(path)
+        existing: List[dict[str, object]] = []
+        if resume:
+            # A columnar run may have rows in both the final file and its checkpoint.
+            for source in dict.fromkeys((path, self._stream_path)):
+                if not os.path.exists(source):
+                    continue
+                for row in read_results(source):
+                    key = result_key(row)
+                    if key not in self.completed:
+                        self.completed.add(key)
+                        existing.append(row)
+        self._rewrite(existing)
+
+    def _open(self, path: str, mode: str) -> None:
+        self._handle = open(path, mode, newline="", encoding="utf-8")
+        if self._format == "csv":
+            self._csv = csv.DictWriter(self._handle, fieldnames=self._fieldnames, restval="")
+
+    def _rewrite(self, rows: List[dict[str, object]]) -> None:
+        """Write ``rows`` from scratch, leaving the file open for appending.
+
+        The rows go to ``<path>.tmp`` first, which is fsynced and then renamed
+        over the output, so a crash mid-rewrite never loses finished rows.
+        """
+        if self._handle is not None:
+            self._handle.close()
+        self._count = 0
+        self._fieldnames = _fieldnames(rows)
+        tmp_path = self._stream_path + ".tmp"
+        self._open(tmp_path, "w")
+        if self._format == "csv":
+            assert self._csv is not None
+            self._csv.writeheader()
+        for row in rows:
+            self._append(row)
+        self._sync()
+        self._handle.close()  # type: ignore[union-attr]
+        os.replace(tmp_path, self._stream_path)
+        _fsync_dir(self._stream_path)
+        self._open(self._stream_path, "a")
+
+    def _append(self, row: dict[str, object]) -> None:
+        assert self._handle is not None
+        if self._format == "csv":
+            assert self._csv is not None
+            self._csv.writerow(row)
+        elif self._format == "jsonl":
+            self._handle.write(json.dumps(row) + "\n")
+        else:
+            self._handle.write(("[\n" if self._count == 0 else ",\n") + json.dumps(row))
+        self._count += 1
+
+    def write(self, row: dict[str, object]) -> None:
+        if self._format == "csv" and not set(row) <= set(self._fieldnames):
+            # A new column appeared; widen the header by rewriting what we have.
+            self._handle.close()  # type: ignore[union-attr]
+            rows = read_results(self._stream_path)
+            self._rewrite(rows + [row])
+        else:
+            self._append(row)
+        self.rows_written += 1
+        self.completed.add(result_key(row))
+        self._handle.flush()  # type: ignore[union-attr]
+        self._unsynced += 1
+        now = time.monotonic()
+        if self._unsynced >= self.fsync_every or now - self._last_sync >= self.fsync_interval:
+            self._sync()
+
+    def _sync(self) -> None:
+        assert self._handle is not None
+        self._handle.flush()
+        os.fsync(self._handle.fileno())
+        self._unsynced = 0
+        self._last_sync = time.monotonic()
+
+    def close(self) -> None:
+        if self._handle is None:
+            return
+        if self._format == "json":
+            self._handle.write("\n]\n" if self._count else "[]\n")
+        self._sync()
+        self._handle.close()
+        self._handle = None
+        if self._columnar:
+            rows = read_results(self._stream_path)
+            results_store.save_table(results_store.ResultTable.from_rows(rows), self.path)
+            os.remove(self._stream_path)
+
+    def __enter__(self) -> "ResultWriter":
+        return self
+
+    def __exit__(self, *exc: object) -> None:
+        self.close()
+
+
+def _fieldnames(rows: List[dict[str, object]]) -> List[str]:
+    if not rows:
+        return list(FIELD_TYPES)
+    names = [name for name in FIELD_TYPES if any(name in row for row in rows)]
+    for row in rows:
+        names.extend(name for name in row if name not in names)
+    return names
+
 
-    fieldnames = [
-        "algorithm",
-        "gap_variant",
-        "n",
-        "dataset",
-        "trial",
-        "seed",
-        "time_ms",
-        "comparisons",
-        "swaps",
-        "writes",
-    ]
-    with open(path, "w", newline="", encoding="utf-8") as handle:
-        writer = csv.DictWriter(handle, fieldnames=fieldnames)
-        writer.writeheader()
+def write_results(path: str, rows: Iterable[dict[str, object]]) -> None:
+    with ResultWriter(path) as writer:
         for row in rows:
-            writer.writerow(row)
+            writer.write(row)
+
+
+def _coerce(name: str, value: object) -> object:
+    if not isinstance(value, str):
+        return value
+    if name in FIELD_TYPES:
+        return FIELD_TYPES[name](value)
+    for convert in (int, float):
+        try:
+            return convert(value)
+        except ValueError:
+            pass
+    return value
+
+
+def _load_json_rows(text: str) -> List[dict[str, object]]:
+    try:
+        return json.loads(text)
+    except json.JSONDecodeError:
+        pass
+    # An interrupted streamed array: one row per line, no closing bracket.
+    rows = []
+    for line in text.splitlines():
+        line = line.strip().lstrip("[").rstrip(",]").strip()
+        if not line:
+            continue
+        try:
+            rows.append(json.loads(line))
+        except json.JSONDecodeError:
+            continue
+    return rows
+
+
+def read_results(path: str) -> List[dict[str, object]]:
+    """Load rows written by :func:`write_results` with their original types.
+
+    A torn final row left by an interrupted run is dropped.
+    """
+    fmt = _format(path)
+    if fmt == "cols":
+        return results_store.load_table(path).to_rows()
+    with open(path, "r", newline="", encoding="utf-8") as handle:
+        text = handle.read()
+    if fmt == "json":
+        raw = _load_json_rows(text)
+    elif fmt == "jsonl":
+        raw = []
+        for line in text.splitlines():
+            try:
+                raw.append(json.loads(line))
+            except json.JSONDecodeError:
+                continue
+    else:
+        if text and not text.endswith("\n"):
+            # Every complete CSV row ends with a newline; drop a torn one.
+            text = text[: text.rfind("\n") + 1]
+        raw = list(csv.DictReader(io.StringIO(text, newline="")))
+
+    rows = []
+    for row in raw:
+        if any(value is None for value in row.values()):
+            continue
+        rows.append({name: _coerce(name, value) for name, value in row.items()})
+    return rows
+
+
+def load_results_table(path: str) -> results_store.ResultTable:
+    """Columnar view of any results file.
+
+    CSV/JSON inputs are converted once and cached as ``<path>.cols``. The
+    cache records the source's size and ``st_mtime_ns`` and is rebuilt
+    unless both still match exactly.
+    """
+    if _format(path) == "cols":
+        return results_store.load_table(path)
+    cache = path + ".cols"
+    stat = os.stat(path)
+    source = {"size": stat.st_size, "mtime_ns": stat.st_mtime_ns}
+    try:
+        if results_store.table_source(cache) == source:
+            return results_store.load_table(cache)
+    except (OSError, ValueError):
+        pass
+    table = results_store.ResultTable.from_rows(read_results(path))
+    try:
+        results_store.save_table(table, cache, source=source)
+    except OSError:
+        pass
+    return table
+
+
+def _row_cell(row: dict[str, object]) -> Cell:
+    return (
+        str(row["algorithm"]),
+        str(row["gap_variant"]),
+        str(row["dataset"]),
+        # Rows written before element types existed are all ints.
+        str(row.get("element_type") or "int"),
+        int(row["n"]),  # type: ignore[arg-type]
+        int(row["trial"]),  # type: ignore[arg-type]
+    )
+
+
+def merge_results(
+    paths: Iterable[str],
+    algorithms: Iterable[str],
+    sizes: Iterable[int],
+    datasets: Iterable[str],
+    trials: int,
+    base_seed: int,
+    gap_variants: Iterable[str] | None = None,
+    element_types: Iterable[str] | None = None,
+    kernel: str | None = None,
+) -> List[dict[str, object]]:
+    """Combine shard outputs into the rows the equivalent serial run produces.
+
+    Every grid cell must appear exactly once, with the seed the serial run
+    would have used.
+    """
+    sizes = list(sizes)
+    datasets = list(datasets)
+    cells = list(
+        iter_cells(algorithms, sizes, datasets, trials, gap_variants, element_types, kernel)
+    )
+    seed_map = _build_seed_map(datasets, sizes, trials, base_seed)
+    expected = set(cells)
+    merged: dict[Cell, dict[str, object]] = {}
+    for path in paths:
+        for row in read_results(path):
+            cell = _row_cell(row)
+            if cell not in expected:
+                raise ValueError(f"{path}: row {cell} is not part of the benchmark grid")
+            if cell in merged:
+                raise ValueError(f"{path}: duplicate row for {cell}")
+            if row["seed"] != seed_map[(cell[2], cell[4], cell[5])]:
+                raise ValueError(f"{path}: seed mismatch for {cell}")
+            merged[cell] = row
+    missing = [cell for cell in cells if cell not in merged]
+    if missing:
+        raise ValueError(f"Missing {len(missing)} cells, first: {missing[0]}")
+    return [merged[cell] for cell in cells]
 
 
 def default_sizes() -> List[int]:
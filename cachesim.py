@@ -0,0 +1,131 @@
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from instrumentation import Event, Instrumentation
+from trace_compression import expand_event
+
+# (low, high, column) buckets for |index delta| between consecutive accesses.
+STRIDE_BUCKETS: Tuple[Tuple[int, Optional[int], str], ...] = (
+    (0, 0, "stride_0"),
+    (1, 1, "stride_1"),
+    (2, 7, "stride_2_7"),
+    (8, 63, "stride_8_63"),
+    (64, 511, "stride_64_511"),
+    (512, None, "stride_512p"),
+)
+
+
+@dataclass(frozen=True)
+class CacheConfig:
+    """Geometry of the modelled cache, in bytes (defaults resemble an L1 data cache).
+
+    ``element_size`` is the size of one array slot; a CPython list stores
+    8-byte pointers.
+    """
+
+    line_size: int = 64
+    capacity: int = 32 * 1024
+    ways: int = 8
+    element_size: int = 8
+
+    def __post_init__(self) -> None:
+        if min(self.line_size, self.capacity, self.ways, self.element_size) < 1:
+            raise ValueError("cache geometry values must be positive")
+        if self.capacity % (self.line_size * self.ways):
+            raise ValueError("capacity must be a multiple of line_size * ways")
+
+    @property
+    def sets(self) -> int:
+        return self.capacity // (self.line_size * self.ways)
+
+
+class CacheModel:
+    """Set-associative cache with LRU replacement over array indices."""
+
+    def __init__(self, config: CacheConfig | None = None) -> None:
+        self.config = config or CacheConfig()
+        self.hits = 0
+        self.misses = 0
+        # Each set maps tag -> None; dict order is the LRU order.
+        self._sets: List[Dict[int, None]] = [{} for _ in range(self.config.sets)]
+
+    def access(self, index: int) -> bool:
+        config = self.config
+        line = index * config.element_size // config.line_size
+        lines = self._sets[line % config.sets]
+        tag = line // config.sets
+        if tag in lines:
+            del lines[tag]
+            lines[tag] = None
+            self.hits += 1
+            return True
+        lines[tag] = None
+        if len(lines) > config.ways:
+            del lines[next(iter(lines))]
+        self.misses += 1
+        return False
+
+
+class CacheSink:
+    """Instrumentation event sink that replays array accesses through a cache model.
+
+    Compares read both slots, swaps read and write both, and writes touch
+    one slot. Compressed run events are expanded, so the sink can sit behind
+    a ``TraceCompressor`` too.
+    """
+
+    def __init__(self, config: CacheConfig | None = None) -> None:
+        self.model = CacheModel(config)
+        self.accesses = 0
+        # Counter totals implied by the events seen, to spot untraced work.
+        self.comparisons = 0
+        self.swaps = 0
+        self.writes = 0
+        self.strides: Dict[str, int] = {column: 0 for _, _, column in STRIDE_BUCKETS}
+        self._previous: Optional[int] = None
+
+    def _touch(self, index: int) -> None:
+        self.accesses += 1
+        self.model.access(index)
+        if self._previous is not None:
+            stride = abs(index - self._previous)
+            for low, high, column in STRIDE_BUCKETS:
+                if stride >= low and (high is None or stride <= high):
+                    self.strides[column] += 1
+                    break
+        self._previous = index
+
+    def __call__(self, event: Event) -> None:
+        for raw in expand_event(event):
+            if raw.kind == "compare":
+                self.comparisons += 1
+                for index in raw.indices:
+                    self._touch(index)
+            elif raw.kind == "swap":
+                self.swaps += 1
+                self.writes += 2
+                for index in raw.indices * 2:
+                    self._touch(index)
+            elif raw.kind == "write":
+                self.writes += 1
+                self._touch(raw.indices[0])
+
+    def covers(self, inst: Instrumentation) -> bool:
+        """Whether every comparison, swap and write counted by ``inst`` reached the sink."""
+        return (self.comparisons, self.swaps, self.writes) == (
+            inst.comparisons,
+            inst.swaps,
+            inst.writes,
+        )
+
+    def stats(self) -> Dict[str, object]:
+        """Extra result columns for a benchmark row."""
+        misses = self.model.misses
+        return {
+            "cache_accesses": self.accesses,
+            "cache_misses": misses,
+            "cache_miss_rate": round(misses / self.accesses, 6) if self.accesses else 0.0,
+            **self.strides,
+        }
@@ -1,7 +1,8 @@
 from __future__ import annotations
 
 import random
-from typing import Callable, List
+from operator import itemgetter
+from typing import Any, Callable, List, Optional
 
 
 def random_dataset(n: int, seed: int) -> List[int]:
@@ -47,12 +48,38 @@ DATASETS: dict[str, Callable[[int, int], List[int]]] = {
 }
 
 
-def generate(name: str, n: int, seed: int) -> List[int]:
+# Order-preserving conversions of the integer datasets, so every shape keeps
+# its presortedness while comparison cost varies with the element type.
+ELEMENT_TYPES: dict[str, Callable[[List[int]], List[Any]]] = {
+    "int": lambda values: values,
+    "float": lambda values: [value / 10 for value in values],
+    "str": lambda values: [f"item-{value:012d}" for value in values],
+    "record": lambda values: [(value, pos) for pos, value in enumerate(values)],
+}
+
+ELEMENT_KEYS: dict[str, Callable[[Any], Any]] = {
+    "record": itemgetter(0),
+}
+
+
+def generate(name: str, n: int, seed: int, element_type: str = "int") -> List[Any]:
     key = name.lower()
     if key not in DATASETS:
         raise ValueError(f"Unknown dataset: {name}")
-    return DATASETS[key](n, seed)
+    kind = element_type.lower()
+    if kind not in ELEMENT_TYPES:
+        raise ValueError(f"Unknown element type: {element_type}")
+    return ELEMENT_TYPES[kind](DATASETS[key](n, seed))
+
+
+def element_key(element_type: str) -> Optional[Callable[[Any], Any]]:
+    """Return the sort key for ``element_type``, or None to compare elements directly."""
+    return ELEMENT_KEYS.get(element_type.lower())
 
 
 def available_datasets() -> List[str]:
     return sorted(DATASETS.keys())
+
+
+def available_element_types() -> List[str]:
+    return sorted(ELEMENT_TYPES.keys())
@@ -0,0 +1,145 @@
+from __future__ import annotations
+
+import itertools
+import os
+import tempfile
+from array import array
+from typing import BinaryIO, Dict, Iterable, Iterator, List, Optional
+
+from instrumentation import Instrumentation
+from sorts.merge import iter_merge
+
+# Files are raw native-endian signed 64-bit integers, as written by array("q").tofile().
+TYPECODE = "q"
+ITEM_SIZE = array(TYPECODE).itemsize
+
+
+def write_ints(path: str, values: Iterable[int]) -> None:
+    with open(path, "wb") as handle:
+        array(TYPECODE, values).tofile(handle)
+
+
+def read_ints(path: str) -> List[int]:
+    data = array(TYPECODE)
+    with open(path, "rb") as handle:
+        data.frombytes(handle.read())
+    return data.tolist()
+
+
+class _IO:
+    """Byte counters shared by every reader and writer of one sort."""
+
+    def __init__(self) -> None:
+        self.bytes_read = 0
+        self.bytes_written = 0
+
+    def read_blocks(self, handle: BinaryIO, items: int) -> Iterator[array]:
+        while True:
+            raw = handle.read(items * ITEM_SIZE)
+            if not raw:
+                return
+            self.bytes_read += len(raw)
+            block = array(TYPECODE)
+            block.frombytes(raw)
+            yield block
+
+    def read_run(self, path: str, buffer_items: int) -> Iterator[int]:
+        with open(path, "rb") as handle:
+            for block in self.read_blocks(handle, buffer_items):
+                yield from block
+
+    def write_run(
+        self, path: str, values: Iterable[int], buffer_items: int, inst: Instrumentation
+    ) -> None:
+        buffer = array(TYPECODE)
+        with open(path, "wb") as handle:
+            for value in values:
+                buffer.append(value)
+                if len(buffer) >= buffer_items:
+                    self._flush(handle, buffer, inst)
+                    buffer = array(TYPECODE)
+            self._flush(handle, buffer, inst)
+
+    def _flush(self, handle: BinaryIO, buffer: array, inst: Instrumentation) -> None:
+        if buffer:
+            buffer.tofile(handle)
+            self.bytes_written += len(buffer) * ITEM_SIZE
+            inst.count(writes=len(buffer))
+
+
+def external_sort(
+    src: str,
+    dst: str,
+    inst: Optional[Instrumentation] = None,
+    chunk_items: int = 1 << 20,
+    fan_in: int = 16,
+    buffer_items: int = 8192,
+    kernel: str = "shell",
+    gap_variant: str = "tokuda",
+    tmp_dir: Optional[str] = None,
+) -> Dict[str, int]:
+    """Sort the int64 file ``src`` into ``dst`` using bounded memory.
+
+    The first pass reads ``chunk_items`` values at a time, sorts them in
+    memory with the registered ``kernel`` and spills each sorted run to
+    ``tmp_dir``. Merge passes then combine up to ``fan_in`` runs at a time,
+    reading and writing through ``buffer_items``-value buffers, until the
+    last merge writes ``dst``. The kernel's counters and the merge's
+    comparisons go to ``inst``, and every value written to disk counts as
+    one write. The returned stats (also put in ``inst.stats``) are
+    ``runs``, ``passes``, ``io_bytes_read`` and ``io_bytes_written``.
+    """
+    from sorts import ALGORITHMS
+
+    if chunk_items < 1 or buffer_items < 1 or fan_in < 2:
+        raise ValueError("chunk_items and buffer_items must be >= 1 and fan_in >= 2")
+    size = os.path.getsize(src)
+    if size % ITEM_SIZE:
+        raise ValueError(f"{src} is not a whole number of {ITEM_SIZE}-byte integers")
+    inst = inst or Instrumentation()
+    io = _IO()
+    initial_runs = -(-size // (chunk_items * ITEM_SIZE))
+
+    with tempfile.TemporaryDirectory(prefix="extsort-", dir=tmp_dir) as scratch:
+        names = (os.path.join(scratch, f"run-{k}.bin") for k in itertools.count())
+
+        # Pass 1: sorted runs. A single run is written straight to dst.
+        runs: List[str] = []
+        with open(src, "rb") as handle:
+            for block in io.read_blocks(handle, chunk_items):
+                chunk = block.tolist()
+                chunk_inst = Instrumentation()
+                ALGORITHMS[kernel](chunk, chunk_inst, gap_variant=gap_variant or "tokuda")
+                inst.count(chunk_inst.comparisons, chunk_inst.swaps, chunk_inst.writes)
+                path = dst if initial_runs == 1 else next(names)
+                io.write_run(path, chunk, buffer_items, inst)
+                runs.append(path)
+        passes = 1
+
+        if not runs:
+            io.write_run(dst, (), buffer_items, inst)
+        while len(runs) > 1:
+            last = len(runs) <= fan_in
+            merged: List[str] = []
+            for start in range(0, len(runs), fan_in):
+                group = runs[start : start + fan_in]
+                path = dst if last else next(names)
+                if len(group) == 1:
+                    os.replace(group[0], path)
+                else:
+                    streams = [io.read_run(run, buffer_items) for run in group]
+                    io.write_run(path, iter_merge(streams, inst), buffer_items, inst)
+                    for run in group:
+                        os.remove(run)
+                merged.append(path)
+            runs = merged
+            passes += 1
+
+    stats = {
+        "runs": initial_runs,
+        "passes": passes,
+        "io_bytes_read": io.bytes_read,
+        "io_bytes_written": io.bytes_written,
+    }
+    inst.stats.update(stats)
+    return stats
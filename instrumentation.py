@@ -1,7 +1,9 @@
 from __future__ import annotations
 
+import math
+import random
 from dataclasses import dataclass
-from typing import Any, Callable, Optional, Tuple
+from typing import Any, Callable, Dict, Iterable, List, Optional, Protocol, Tuple
 
 
 @dataclass(frozen=True)
@@ -15,12 +17,202 @@ class Event:
     writes: int = 0
 
 
+class Sampler(Protocol):
+    def accept(self, kind: str) -> bool: ...
+
+
+# Event kinds that change the array; a replayed trace needs every one of them.
+STATE_KINDS = frozenset({"swap", "write"})
+
+
+class EveryKth:
+    """Keep the 1st, (k+1)th, (2k+1)th, ... event."""
+
+    def __init__(self, k: int) -> None:
+        if k < 1:
+            raise ValueError("k must be >= 1")
+        self.k = k
+        self._seen = 0
+
+    def accept(self, kind: str) -> bool:
+        keep = self._seen % self.k == 0
+        self._seen += 1
+        return keep
+
+
+class KindFilter:
+    """Keep only events of the given kinds (e.g. swaps and writes)."""
+
+    def __init__(self, kinds: Iterable[str]) -> None:
+        self.kinds = frozenset(kinds)
+
+    def accept(self, kind: str) -> bool:
+        return kind in self.kinds
+
+
+class RateLimit:
+    """Keep at most ``max_events`` out of every ``window`` consecutive events.
+
+    Windows are counted in events rather than seconds so sampled traces stay
+    deterministic.
+    """
+
+    def __init__(self, max_events: int, window: int) -> None:
+        if max_events < 0 or window < 1:
+            raise ValueError("need max_events >= 0 and window >= 1")
+        self.max_events = max_events
+        self.window = window
+        self._seen = 0
+        self._kept = 0
+
+    def accept(self, kind: str) -> bool:
+        if self._seen % self.window == 0:
+            self._kept = 0
+        self._seen += 1
+        if self._kept < self.max_events:
+            self._kept += 1
+            return True
+        return False
+
+
+class KeepState:
+    """Pass every swap and write and let ``inner`` sample the other kinds.
+
+    Use this whenever the consumer rebuilds the array from the trace
+    (visualization, GIFs), so that sampling never corrupts the replayed state.
+    """
+
+    def __init__(self, inner: Sampler) -> None:
+        self.inner = inner
+
+    def accept(self, kind: str) -> bool:
+        return kind in STATE_KINDS or self.inner.accept(kind)
+
+
+class ReservoirSampler:
+    """Uniform sample of ``size`` events from a trace of unknown length.
+
+    Acts as both sampler and sink: ``Instrumentation(event_sink=r, sampler=r)``.
+    Skips are drawn ahead of time (Li's Algorithm L), so events that are not
+    kept are never built. :attr:`events` returns the sample in trace order.
+    Events whose kind is in ``keep_kinds`` are always kept, in addition to
+    the sample, and don't count towards it.
+    """
+
+    def __init__(self, size: int, seed: int = 0, keep_kinds: Iterable[str] = ()) -> None:
+        if size < 1:
+            raise ValueError("size must be >= 1")
+        self.size = size
+        self.seed = seed
+        self.keep_kinds = frozenset(keep_kinds)
+        self._rng = random.Random(seed)
+        self._seen = 0
+        self._tick = 0
+        self._slot = 0
+        self._sample: List[Tuple[int, Event]] = []
+        self._kept: List[Tuple[int, Event]] = []
+        self._weight = math.exp(math.log(self._rng.random()) / size)
+        self._next = size + self._skip()
+
+    def _skip(self) -> int:
+        return int(math.log(self._rng.random()) / math.log(1 - self._weight)) + 1
+
+    def accept(self, kind: str) -> bool:
+        self._tick += 1
+        if kind in self.keep_kinds:
+            self._slot = -1
+            return True
+        self._seen += 1
+        if self._seen <= self.size:
+            self._slot = self._seen - 1
+            return True
+        if self._seen < self._next:
+            return False
+        self._slot = self._rng.randrange(self.size)
+        self._weight *= math.exp(math.log(self._rng.random()) / self.size)
+        self._next += self._skip()
+        return True
+
+    def __call__(self, event: Event) -> None:
+        entry = (self._tick, event)
+        if self._slot < 0:
+            self._kept.append(entry)
+        elif self._slot < len(self._sample):
+            self._sample[self._slot] = entry
+        else:
+            self._sample.append(entry)
+
+    @property
+    def events(self) -> List[Event]:
+        entries = sorted(self._sample + self._kept, key=lambda entry: entry[0])
+        return [event for _, event in entries]
+
+
+def keep_state(sampler: Sampler) -> Sampler:
+    """A sampler like ``sampler`` that also keeps every state-changing event.
+
+    ``sampler`` itself is left as it was; a reservoir gets a fresh copy with
+    the same size and seed.
+    """
+    if isinstance(sampler, ReservoirSampler):
+        return ReservoirSampler(
+            sampler.size, sampler.seed, keep_kinds=sampler.keep_kinds | STATE_KINDS
+        )
+    if isinstance(sampler, KeepState):
+        return sampler
+    return KeepState(sampler)
+
+
+def parse_sampler(spec: str) -> Sampler:
+    """Build a sampler from a CLI spec.
+
+    ``every:K``, ``kinds:swap,write``, ``window:N/W`` or ``reservoir:N[:SEED]``.
+    """
+    name, _, arg = spec.partition(":")
+    try:
+        if name == "every":
+            return EveryKth(int(arg))
+        if name == "kinds":
+            return KindFilter(kind for kind in arg.split(",") if kind)
+        if name == "window":
+            max_events, window = arg.split("/")
+            return RateLimit(int(max_events), int(window))
+        if name == "reservoir":
+            size, _, seed = arg.partition(":")
+            return ReservoirSampler(int(size), int(seed or 0))
+    except ValueError as exc:
+        raise ValueError(f"Invalid sampler spec {spec!r}: {exc}") from exc
+    raise ValueError(f"Unknown sampler spec: {spec!r}")
+
+
 class Instrumentation:
-    def __init__(self, event_sink: Optional[Callable[[Event], None]] = None) -> None:
+    def __init__(
+        self,
+        event_sink: Optional[Callable[[Event], None]] = None,
+        sampler: Optional[Sampler] = None,
+    ) -> None:
         self.comparisons = 0
         self.swaps = 0
         self.writes = 0
+        # Extra per-run measurements (e.g. worker count) that benchmark rows pick up.
+        self.stats: Dict[str, Any] = {}
         self._event_sink = event_sink
+        self._sampler = sampler
+
+    @property
+    def tracing(self) -> bool:
+        """Whether events are being delivered to a sink."""
+        return self._event_sink is not None
+
+    def count(self, comparisons: int = 0, swaps: int = 0, writes: int = 0) -> None:
+        """Add to the counters in bulk, without emitting events.
+
+        For vectorized kernels that perform a whole phase of operations at
+        once; they should fall back to per-element calls while tracing.
+        """
+        self.comparisons += comparisons
+        self.swaps += swaps
+        self.writes += writes
 
     def _emit(
         self,
@@ -31,6 +223,9 @@ class Instrumentation:
     ) -> None:
         if not self._event_sink:
             return
+        # Counters are already updated, so sampling never affects their totals.
+        if self._sampler is not None and not self._sampler.accept(kind):
+            return
         event = Event(
             kind=kind,
             indices=tuple(indices),
@@ -4,11 +4,54 @@ import argparse
 from typing import List
 
 import benchmark
-from datasets import available_datasets, generate
-from instrumentation import Instrumentation
+from cachesim import CacheConfig
+from datasets import available_datasets, available_element_types, generate
+from instrumentation import Instrumentation, parse_sampler
 from sorts import ALGORITHMS
 from sorts.gaps import available_variants
-from visualizer import visualize
+from trace_compression import record_trace
+from visualizer import EventStream, visualize, visualize_stream
+
+
+def _shard_spec(value: str) -> tuple[int, int]:
+    try:
+        return benchmark.parse_shard(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+
+
+def _sampler_spec(value: str) -> str:
+    try:
+        parse_sampler(value)
+    except ValueError as exc:
+        raise argparse.ArgumentTypeError(str(exc)) from exc
+    return value
+
+
+# Kernels that parallel and external can sort their chunks with.
+_CHUNK_KERNELS = sorted(set(ALGORITHMS) - {"external", "parallel"})
+
+
+def _add_grid_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--algo",
+        choices=sorted(list(ALGORITHMS.keys()) + ["all"]),
+        default="all",
+    )
+    parser.add_argument("--sizes", nargs="+", type=int, default=None)
+    parser.add_argument("--datasets", nargs="+", choices=available_datasets(), default=None)
+    parser.add_argument("--trials", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--gaps", nargs="+", choices=available_variants(), default=None)
+    parser.add_argument(
+        "--element-types", nargs="+", choices=available_element_types(), default=None
+    )
+    parser.add_argument(
+        "--kernel",
+        choices=_CHUNK_KERNELS,
+        default=None,
+        help="Kernel that sorts each chunk in parallel and external (default: shell)",
+    )
 
 
 def _parse_args() -> argparse.Namespace:
@@ -22,19 +65,97 @@ def _parse_args() -> argparse.Namespace:
     viz.add_argument("--dataset", choices=available_datasets(), default="random")
     viz.add_argument("--gap", choices=available_variants(), default="shell")
     viz.add_argument("--speed", type=float, default=1.0)
+    viz.add_argument(
+        "--stream",
+        action="store_true",
+        help="Animate while the sort runs, through a bounded event queue",
+    )
+    viz.add_argument("--queue-size", type=int, default=1024)
+    viz.add_argument(
+        "--sample",
+        type=_sampler_spec,
+        default=None,
+        help=(
+            "Trace sampling: every:K, kinds:swap,write, window:N/W or reservoir:N[:SEED]. "
+            "Only compares and marks are sampled; every swap and write is kept, "
+            "so reservoir:N holds N events plus all swaps and writes"
+        ),
+    )
 
     bench = subparsers.add_parser("bench", help="Run algorithm benchmarks")
+    _add_grid_args(bench)
+    bench.add_argument("--shard", type=_shard_spec, default=None, metavar="I/K")
+    bench.add_argument("--out", required=True)
     bench.add_argument(
-        "--algo",
-        choices=sorted(list(ALGORITHMS.keys()) + ["all"]),
-        default="all",
+        "--resume",
+        action="store_true",
+        help="Keep rows already in --out and run only the missing cells",
+    )
+    bench.add_argument(
+        "--cache-model",
+        action="store_true",
+        help="Add modelled cache misses and stride histograms (one extra untimed pass per cell)",
+    )
+    bench.add_argument("--cache-line", type=int, default=64, help="cache line size in bytes")
+    bench.add_argument("--cache-size", type=int, default=32 * 1024, help="cache capacity in bytes")
+    bench.add_argument("--cache-ways", type=int, default=8, help="cache associativity")
+    bench.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Process count for the parallel algorithm (default: all CPUs)",
+    )
+    bench.add_argument(
+        "--small-kernel",
+        choices=_CHUNK_KERNELS,
+        default=None,
+        help="Kernel for parallel chunks of at most --small-threshold elements (default: insertion)",
+    )
+    bench.add_argument("--small-threshold", type=int, default=None, metavar="N")
+    bench.add_argument(
+        "--probe",
+        action="store_true",
+        help="Add sampled presortedness columns (runs, inversions, distinct ratio)",
     )
-    bench.add_argument("--sizes", nargs="+", type=int, default=None)
-    bench.add_argument("--datasets", nargs="+", choices=available_datasets(), default=None)
-    bench.add_argument("--trials", type=int, default=5)
-    bench.add_argument("--seed", type=int, default=0)
-    bench.add_argument("--gaps", nargs="+", choices=available_variants(), default=None)
-    bench.add_argument("--out", required=True)
+
+    merge = subparsers.add_parser(
+        "merge", help="Combine shard outputs (pass the same grid options as bench)"
+    )
+    _add_grid_args(merge)
+    merge.add_argument("--out", required=True)
+    merge.add_argument("inputs", nargs="+")
+
+    extsort = subparsers.add_parser(
+        "extsort", help="Sort a binary int64 file that may not fit in memory"
+    )
+    extsort.add_argument("input", help="native-endian int64 file")
+    extsort.add_argument("output")
+    extsort.add_argument("--chunk-items", type=int, default=1 << 20, help="values per in-memory run")
+    extsort.add_argument("--fan-in", type=int, default=16, help="runs merged at once")
+    extsort.add_argument("--buffer-items", type=int, default=8192, help="values per I/O buffer")
+    extsort.add_argument(
+        "--kernel",
+        choices=_CHUNK_KERNELS,
+        default="shell",
+        help="kernel that sorts each in-memory run",
+    )
+    extsort.add_argument("--gap", choices=available_variants(), default="tokuda")
+    extsort.add_argument("--tmp-dir", default=None, help="where to spill runs (default: system temp)")
+    extsort.add_argument(
+        "--generate",
+        type=int,
+        default=None,
+        metavar="N",
+        help="First write N values of --dataset to the input file (built in memory)",
+    )
+    extsort.add_argument("--dataset", choices=available_datasets(), default="random")
+    extsort.add_argument("--seed", type=int, default=0)
+
+    serve = subparsers.add_parser("serve", help="Run a local benchmark job server")
+    serve.add_argument("--host", default="127.0.0.1")
+    serve.add_argument("--port", type=int, default=8765)
+    serve.add_argument("--workers", type=int, default=1)
+    serve.add_argument("--quiet", action="store_true")
 
     return parser.parse_args()
 
@@ -42,18 +163,29 @@ def _parse_args() -> argparse.Namespace:
 def _run_viz(args: argparse.Namespace) -> None:
     data = generate(args.dataset, args.n, args.seed)
     initial = list(data)
-    events = []
-    inst = Instrumentation(event_sink=events.append)
     sort_fn = ALGORITHMS[args.algo]
-    sort_fn(data, inst, gap_variant=args.gap)
 
     title = f"{args.algo.title()} Sort ({args.dataset}, n={args.n})"
     if args.algo == "shell":
         title += f" - {args.gap} gaps"
+
+    if args.stream:
+
+        def produce(sink) -> None:
+            sampler = parse_sampler(args.sample) if args.sample else None
+            record_trace(sort_fn, data, sink, sampler=sampler, gap_variant=args.gap)
+
+        stream = EventStream(produce, maxsize=args.queue_size).start()
+        visualize_stream(initial, stream, speed=args.speed, title=title)
+        return
+
+    events = []
+    sampler = parse_sampler(args.sample) if args.sample else None
+    record_trace(sort_fn, data, events.append, sampler=sampler, gap_variant=args.gap)
     visualize(initial, events, speed=args.speed, title=title)
 
 
-def _run_bench(args: argparse.Namespace) -> None:
+def _grid(args: argparse.Namespace) -> dict[str, object]:
     algorithms: List[str]
     if args.algo == "all":
         algorithms = list(sorted(ALGORITHMS.keys()))
@@ -62,17 +194,96 @@ def _run_bench(args: argparse.Namespace) -> None:
 
     sizes = args.sizes if args.sizes is not None else benchmark.default_sizes()
     datasets = args.datasets if args.datasets is not None else benchmark.default_datasets()
+    return {
+        "algorithms": algorithms,
+        "sizes": sizes,
+        "datasets": datasets,
+        "trials": args.trials,
+        "base_seed": args.seed,
+        "gap_variants": args.gaps,
+        "element_types": args.element_types,
+        "kernel": args.kernel,
+    }
 
-    results = benchmark.run_benchmarks(
-        algorithms=algorithms,
-        sizes=sizes,
-        datasets=datasets,
-        trials=args.trials,
-        base_seed=args.seed,
-        gap_variants=args.gaps,
-    )
+
+def _cache_config(args: argparse.Namespace) -> CacheConfig | None:
+    if not args.cache_model:
+        return None
+    try:
+        return CacheConfig(
+            line_size=args.cache_line, capacity=args.cache_size, ways=args.cache_ways
+        )
+    except ValueError as exc:
+        raise SystemExit(f"Invalid cache model: {exc}") from exc
+
+
+def _kernel_options(args: argparse.Namespace) -> dict[str, object]:
+    options = {
+        "small_kernel": args.small_kernel,
+        "small_threshold": args.small_threshold,
+    }
+    return {name: value for name, value in options.items() if value is not None}
+
+
+def _run_bench(args: argparse.Namespace) -> None:
+    cache = _cache_config(args)
+    # Rows are streamed to --out as they finish, so an interrupted sweep can resume.
+    with benchmark.ResultWriter(args.out, resume=args.resume) as writer:
+        kept = len(writer.completed)
+        rows = benchmark.iter_benchmarks(
+            shard=args.shard,
+            skip=frozenset(writer.completed),
+            cache=cache,
+            workers=args.workers,
+            probe=args.probe,
+            kernel_options=_kernel_options(args),
+            **_grid(args),
+        )
+        for row in rows:
+            writer.write(row)
+    message = f"Wrote {writer.rows_written} rows to {args.out}"
+    if args.resume:
+        message += f" (kept {kept} existing rows)"
+    print(message)
+
+
+def _run_merge(args: argparse.Namespace) -> None:
+    results = benchmark.merge_results(args.inputs, **_grid(args))
     benchmark.write_results(args.out, results)
-    print(f"Wrote {len(results)} rows to {args.out}")
+    print(f"Merged {len(args.inputs)} files into {len(results)} rows at {args.out}")
+
+
+def _run_extsort(args: argparse.Namespace) -> None:
+    import extsort
+
+    if args.generate is not None:
+        extsort.write_ints(args.input, generate(args.dataset, args.generate, args.seed))
+    inst = Instrumentation()
+    try:
+        stats = extsort.external_sort(
+            args.input,
+            args.output,
+            inst,
+            chunk_items=args.chunk_items,
+            fan_in=args.fan_in,
+            buffer_items=args.buffer_items,
+            kernel=args.kernel,
+            gap_variant=args.gap,
+            tmp_dir=args.tmp_dir,
+        )
+    except (OSError, ValueError) as exc:
+        raise SystemExit(f"extsort failed: {exc}") from exc
+    print(
+        f"Sorted {args.input} -> {args.output}: {stats['runs']} runs, {stats['passes']} passes, "
+        f"{stats['io_bytes_read']} bytes read, {stats['io_bytes_written']} bytes written, "
+        f"{inst.comparisons} comparisons"
+    )
+
+
+def _run_serve(args: argparse.Namespace) -> None:
+    import service
+
+    service.serve(host=args.host, port=args.port, workers=args.workers, verbose=not args.quiet)
 
 
 def main() -> None:
@@ -81,6 +292,12 @@ def main() -> None:
         _run_viz(args)
     elif args.command == "bench":
         _run_bench(args)
+    elif args.command == "merge":
+        _run_merge(args)
+    elif args.command == "extsort":
+        _run_extsort(args)
+    elif args.command == "serve":
+        _run_serve(args)
 
 
 if __name__ == "__main__":
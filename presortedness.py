@@ -0,0 +1,83 @@
+from __future__ import annotations
+
+import random
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Sequence
+
+DEFAULT_SAMPLES = 256
+
+
+@dataclass(frozen=True)
+class Presortedness:
+    """Sampled measures of how close a sequence already is to sorted order.
+
+    ``runs`` and ``inversions`` are estimates for the whole input (exact
+    when it is small enough to check every pair). ``inversion_ratio`` is
+    inversions over all ``n * (n - 1) / 2`` pairs: 0 when sorted, about 0.5
+    when random and 1 when reversed. ``distinct_ratio`` is the share of
+    distinct values among the sampled elements.
+    """
+
+    n: int
+    runs: int
+    inversions: int
+    inversion_ratio: float
+    distinct_ratio: float
+
+    def as_row(self) -> Dict[str, object]:
+        """Benchmark row columns, prefixed with ``presort_``."""
+        return {f"presort_{name}": value for name, value in asdict(self).items() if name != "n"}
+
+
+def _pairs(n: int, samples: int, rng: random.Random) -> List[tuple[int, int]]:
+    total = n * (n - 1) // 2
+    if total <= samples:
+        return [(i, j) for i in range(n) for j in range(i + 1, n)]
+    pairs = []
+    while len(pairs) < samples:
+        i, j = rng.randrange(n), rng.randrange(n)
+        if i != j:
+            pairs.append((min(i, j), max(i, j)))
+    return pairs
+
+
+def measure(
+    values: Sequence[Any],
+    samples: int = DEFAULT_SAMPLES,
+    key: Optional[Callable[[Any], Any]] = None,
+    seed: int = 0,
+) -> Presortedness:
+    """Estimate run count, inversions and distinct ratio from ``samples`` probes each.
+
+    Only ``<`` is used on the values, so unhashable items such as decorated
+    ``Keyed`` elements work. The probes are seeded, so repeated calls on the
+    same input agree.
+    """
+    n = len(values)
+    if n < 2:
+        return Presortedness(n, min(n, 1), 0, 0.0, 1.0 if n else 0.0)
+    rng = random.Random(seed)
+    at = (lambda i: key(values[i])) if key is not None else values.__getitem__
+
+    # Runs: every descent between neighbours starts a new ascending run.
+    if n - 1 <= samples:
+        starts = range(n - 1)
+    else:
+        starts = [rng.randrange(n - 1) for _ in range(samples)]
+    descents = sum(1 for i in starts if at(i + 1) < at(i))
+    runs = 1 + round(descents / len(starts) * (n - 1))
+
+    pairs = _pairs(n, samples, rng)
+    inversion_ratio = sum(1 for i, j in pairs if at(j) < at(i)) / len(pairs)
+    inversions = round(inversion_ratio * n * (n - 1) / 2)
+
+    picked = sorted(at(i) for i in rng.sample(range(n), min(n, samples)))
+    distinct = 1 + sum(1 for a, b in zip(picked, picked[1:]) if a < b)
+
+    return Presortedness(
+        n=n,
+        runs=runs,
+        inversions=inversions,
+        inversion_ratio=round(inversion_ratio, 4),
+        distinct_ratio=round(distinct / len(picked), 4),
+    )
@@ -0,0 +1,292 @@
+from __future__ import annotations
+
+import json
+import math
+import struct
+import sys
+from array import array
+from statistics import mean, median
+from typing import Any, BinaryIO, Callable, Dict, List, Sequence, Tuple
+
+MAGIC = b"SORTCOL1"
+
+# Column kinds: "q" int64, "d" float64 and "str", stored as uint32 codes
+# into a list of categories. Columns with missing values (absent, None, or
+# "" in a numeric column) carry a uint8 presence mask.
+_INT_CODE = "q"
+_FLOAT_CODE = "d"
+_STR_CODE = "I"
+_MASK_CODE = "B"
+
+
+def _is_missing(value: Any) -> bool:
+    return value is None or value == ""
+
+
+class Column:
+    def __init__(
+        self,
+        kind: str,
+        data: array,
+        categories: List[str] | None = None,
+        mask: array | None = None,
+    ) -> None:
+        self.kind = kind
+        self.data = data
+        self.categories = categories
+        self.mask = mask
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def present(self, pos: int) -> bool:
+        return self.mask is None or bool(self.mask[pos])
+
+    def _decode(self, raw: Any) -> Any:
+        return self.categories[raw] if self.categories is not None else raw
+
+    def values(self) -> List[Any]:
+        """Values in row order, with ``None`` for missing entries."""
+        decoded = [self._decode(raw) for raw in self.data]
+        if self.mask is not None:
+            return [value if flag else None for value, flag in zip(decoded, self.mask)]
+        return decoded
+
+    def take(self, positions: Sequence[int]) -> "Column":
+        data = array(self.data.typecode, (self.data[pos] for pos in positions))
+        mask = None
+        if self.mask is not None:
+            mask = array(_MASK_CODE, (self.mask[pos] for pos in positions))
+        return Column(self.kind, data, self.categories, mask)
+
+    @classmethod
+    def from_values(cls, values: Sequence[Any]) -> "Column":
+        # "" is a real value for strings (e.g. gap_variant) but a gap in numbers.
+        numeric = [value for value in values if not _is_missing(value)]
+        if numeric and all(
+            isinstance(v, (int, float)) and not isinstance(v, bool) for v in numeric
+        ):
+            mask = None
+            if len(numeric) < len(values):
+                mask = array(_MASK_CODE, (not _is_missing(v) for v in values))
+            if all(isinstance(v, int) for v in numeric):
+                ints = [0 if _is_missing(v) else v for v in values]
+                return cls("q", array(_INT_CODE, ints), mask=mask)
+            floats = [0.0 if _is_missing(v) else float(v) for v in values]
+            return cls("d", array(_FLOAT_CODE, floats), mask=mask)
+        categories: List[str] = []
+        index: Dict[str, int] = {}
+        codes = array(_STR_CODE)
+        for value in values:
+            text = "" if value is None else str(value)
+            code = index.get(text)
+            if code is None:
+                code = index[text] = len(categories)
+                categories.append(text)
+            codes.append(code)
+        mask = None
+        if any(value is None for value in values):
+            mask = array(_MASK_CODE, (value is not None for value in values))
+        return cls("str", codes, categories, mask)
+
+
+def _percentile(values: Sequence[float], q: float) -> float:
+    ordered = sorted(values)
+    if not ordered:
+        return math.nan
+    rank = (len(ordered) - 1) * q / 100
+    low = math.floor(rank)
+    high = math.ceil(rank)
+    return ordered[low] + (ordered[high] - ordered[low]) * (rank - low)
+
+
+AGGREGATES: Dict[str, Callable[[Sequence[float]], float]] = {
+    "mean": mean,
+    "median": median,
+    "min": min,
+    "max": max,
+    "count": lambda values: float(len(values)),
+}
+
+
+def aggregate(values: Sequence[float], how: str = "mean") -> float:
+    """Reduce ``values`` with a named aggregate or a ``pNN`` percentile."""
+    if how in AGGREGATES:
+        return float(AGGREGATES[how](values))
+    if how.startswith("p"):
+        return _percentile(values, float(how[1:]))
+    raise ValueError(f"Unknown aggregate: {how}")
+
+
+class ResultTable:
+    """Typed, column-oriented view of benchmark rows.
+
+    Filters work on category codes and group-bys only touch the key and
+    metric columns, so repeated queries avoid re-parsing every row.
+    """
+
+    def __init__(self, columns: Dict[str, Column], length: int) -> None:
+        self.columns = columns
+        self.length = length
+
+    def __len__(self) -> int:
+        return self.length
+
+    @classmethod
+    def from_rows(cls, rows: Sequence[dict[str, Any]]) -> "ResultTable":
+        names: List[str] = []
+        for row in rows:
+            names.extend(name for name in row if name not in names)
+        columns = {name: Column.from_values([row.get(name) for row in rows]) for name in names}
+        return cls(columns, len(rows))
+
+    def to_rows(self) -> List[dict[str, Any]]:
+        """Rows as dicts; a missing value leaves its column out of the row."""
+        values = {name: column.values() for name, column in self.columns.items()}
+        sparse = {name for name, column in self.columns.items() if column.mask is not None}
+        return [
+            {
+                name: column[pos]
+                for name, column in values.items()
+                if name not in sparse or self.columns[name].present(pos)
+            }
+            for pos in range(self.length)
+        ]
+
+    def column(self, name: str) -> List[Any]:
+        return self.columns[name].values()
+
+    def unique(self, name: str) -> List[Any]:
+        column = self.columns[name]
+        codes = {raw for pos, raw in enumerate(column.data) if column.present(pos)}
+        return sorted(column._decode(raw) for raw in codes)
+
+    def _take(self, positions: List[int]) -> "ResultTable":
+        columns = {name: column.take(positions) for name, column in self.columns.items()}
+        return ResultTable(columns, len(positions))
+
+    def where(self, **equals: Any) -> "ResultTable":
+        """Rows whose columns equal the given values; unknown columns match nothing."""
+        return self.filter(tuple(equals), lambda *values: values == tuple(equals.values()))
+
+    def filter(self, names: Sequence[str], predicate: Callable[..., bool]) -> "ResultTable":
+        """Rows for which ``predicate(*values_of(names))`` holds.
+
+        For string columns the predicate runs once per distinct combination
+        of values, not once per row.
+        """
+        if any(name not in self.columns for name in names):
+            return self._take([])
+        columns = [self.columns[name] for name in names]
+        decoded: Dict[Tuple[Any, ...], bool] = {}
+        positions = []
+        for pos in range(self.length):
+            # Missing values reach the predicate as None.
+            raw = tuple(
+                column.data[pos] if column.present(pos) else None for column in columns
+            )
+            keep = decoded.get(raw)
+            if keep is None:
+                values = [
+                    None if code is None else column._decode(code)
+                    for column, code in zip(columns, raw)
+                ]
+                keep = decoded[raw] = bool(predicate(*values))
+            if keep:
+                positions.append(pos)
+        return self._take(positions)
+
+    def group_by(
+        self,
+        keys: Sequence[str],
+        metric: str,
+        how: str = "mean",
+    ) -> Dict[Tuple[Any, ...], float]:
+        """Aggregate ``metric`` per distinct ``keys`` tuple.
+
+        Rows missing the metric or any key are ignored.
+        """
+        key_columns = [self.columns[name] for name in keys]
+        metric_column = self.columns[metric]
+        values = metric_column.data
+        groups: Dict[Tuple[Any, ...], List[float]] = {}
+        for pos in range(self.length):
+            value = values[pos]
+            if not metric_column.present(pos) or (isinstance(value, float) and math.isnan(value)):
+                continue
+            if not all(column.present(pos) for column in key_columns):
+                continue
+            raw = tuple(column.data[pos] for column in key_columns)
+            groups.setdefault(raw, []).append(value)
+        result: Dict[Tuple[Any, ...], float] = {}
+        for raw, group in groups.items():
+            key = tuple(column._decode(code) for column, code in zip(key_columns, raw))
+            result[key] = aggregate(group, how)
+        return dict(sorted(result.items()))
+
+
+def save_table(table: ResultTable, path: str, source: Dict[str, Any] | None = None) -> None:
+    """Write ``table`` to ``path``; ``source`` is stored in the header as is.
+
+    Caches use ``source`` to record which version of the file they were
+    built from (see :func:`table_source`).
+    """
+    header: Dict[str, Any] = {"rows": table.length, "byteorder": sys.byteorder, "columns": []}
+    if source is not None:
+        header["source"] = source
+    blobs: List[bytes] = []
+    for name, column in table.columns.items():
+        blob = column.data.tobytes()
+        mask = column.mask.tobytes() if column.mask is not None else b""
+        header["columns"].append(
+            {
+                "name": name,
+                "kind": column.kind,
+                "typecode": column.data.typecode,
+                "itemsize": column.data.itemsize,
+                "nbytes": len(blob),
+                "categories": column.categories,
+                "mask_nbytes": len(mask),
+            }
+        )
+        blobs.extend((blob, mask))
+    encoded = json.dumps(header).encode("utf-8")
+    with open(path, "wb") as handle:
+        handle.write(MAGIC)
+        handle.write(struct.pack("<I", len(encoded)))
+        handle.write(encoded)
+        for blob in blobs:
+            handle.write(blob)
+
+
+def _read_header(handle: BinaryIO, path: str) -> Dict[str, Any]:
+    if handle.read(len(MAGIC)) != MAGIC:
+        raise ValueError(f"{path} is not a columnar results file")
+    (size,) = struct.unpack("<I", handle.read(4))
+    return json.loads(handle.read(size))
+
+
+def table_source(path: str) -> Dict[str, Any] | None:
+    """The ``source`` stored by :func:`save_table`, without reading the columns."""
+    with open(path, "rb") as handle:
+        return _read_header(handle, path).get("source")
+
+
+def load_table(path: str) -> ResultTable:
+    with open(path, "rb") as handle:
+        header = _read_header(handle, path)
+        columns: Dict[str, Column] = {}
+        for spec in header["columns"]:
+            data = array(spec["typecode"])
+            if data.itemsize != spec["itemsize"]:
+                raise ValueError(f"{path}: unsupported item size for column {spec['name']}")
+            data.frombytes(handle.read(spec["nbytes"]))
+            if header["byteorder"] != sys.byteorder:
+                data.byteswap()
+            mask = None
+            # Files written before masks existed have no "mask_nbytes".
+            if spec.get("mask_nbytes"):
+                mask = array(_MASK_CODE)
+                mask.frombytes(handle.read(spec["mask_nbytes"]))
+            columns[spec["name"]] = Column(spec["kind"], data, spec["categories"], mask)
+    return ResultTable(columns, header["rows"])
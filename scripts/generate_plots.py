@@ -1,147 +1,182 @@
 from __future__ import annotations
 
-import csv
+import argparse
+import hashlib
 import json
-from collections import defaultdict
+import sys
 from pathlib import Path
-from statistics import mean
 from typing import Dict, List, Tuple
 
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
 import matplotlib
 
 matplotlib.use("Agg")
 import matplotlib.pyplot as plt
 
-ROOT = Path(__file__).resolve().parents[1]
+from benchmark import load_results_table
+from results_store import ResultTable
+
 RESULTS_DIR = ROOT / "results"
 BENCH_DIR = RESULTS_DIR / "benchmarks"
 PLOTS_DIR = RESULTS_DIR / "plots"
 TIME_DIR = PLOTS_DIR / "time"
 METRICS_DIR = PLOTS_DIR / "metrics"
 SHELL_DIR = PLOTS_DIR / "shell"
+MANIFEST = PLOTS_DIR / ".manifest.json"
 for path in (PLOTS_DIR, TIME_DIR, METRICS_DIR, SHELL_DIR):
     path.mkdir(parents=True, exist_ok=True)
 
+Series = Dict[str, List[Tuple[int, float]]]
 
-def _load_results_csv(path: Path) -> List[dict[str, str]]:
-    if not path.exists():
-        return []
-    with path.open("r", encoding="utf-8", newline="") as handle:
-        reader = csv.DictReader(handle)
-        return list(reader)
 
-
-def _load_shell_json(path: Path) -> List[dict[str, object]]:
+def _load_table(path: Path) -> ResultTable:
     if not path.exists():
-        return []
-    with path.open("r", encoding="utf-8") as handle:
-        return json.load(handle)
+        return ResultTable({}, 0)
+    return load_results_table(str(path))
+
+
+class PlotCache:
+    """Skip plots whose aggregated input series are unchanged since the last run."""
+
+    def __init__(self, path: Path, force: bool = False) -> None:
+        self.path = path
+        self.force = force
+        self.digests: Dict[str, str] = {}
+        if path.exists():
+            self.digests = json.loads(path.read_text(encoding="utf-8"))
+
+    @staticmethod
+    def digest(series: Series, title: str) -> str:
+        payload = json.dumps({"title": title, "series": series}, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def is_current(self, out: Path, digest: str) -> bool:
+        key = str(out.relative_to(ROOT)) if out.is_relative_to(ROOT) else str(out)
+        return not self.force and out.exists() and self.digests.get(key) == digest
+
+    def record(self, out: Path, digest: str) -> None:
+        key = str(out.relative_to(ROOT)) if out.is_relative_to(ROOT) else str(out)
+        self.digests[key] = digest
+
+    def save(self) -> None:
+        self.path.write_text(json.dumps(self.digests, indent=2, sort_keys=True), encoding="utf-8")
+
+
+def _filter_results(results: ResultTable, dataset: str) -> ResultTable:
+    filtered = results.where(dataset=dataset)
+    if "element_type" in filtered.columns:
+        filtered = filtered.where(element_type="int")
+    return filtered.filter(
+        ("algorithm", "gap_variant"),
+        lambda algorithm, gap_variant: gap_variant in ("", "shell"),
+    )
+
+
+def _series(table: ResultTable, group: str, metric: str, how: str = "mean") -> Series:
+    series: Series = {}
+    for (name, n), value in table.group_by((group, "n"), metric, how).items():
+        series.setdefault(str(name), []).append((int(n), value))
+    return series
+
+
+def _plot(
+    series: Series,
+    out: Path,
+    title: str,
+    ylabel: str,
+    legend_title: str | None,
+    cache: PlotCache | None,
+) -> Path:
+    digest = PlotCache.digest(series, title)
+    if cache is not None and cache.is_current(out, digest):
+        return out
 
+    fig, ax = plt.subplots()
+    for name, points in series.items():
+        ns = [n for n, _ in points]
+        values = [value for _, value in points]
+        ax.plot(ns, values, marker="o", label=name or "(none)")
 
-def _filter_results(results: List[dict[str, str]], dataset: str) -> List[dict[str, str]]:
-    return [
-        row
-        for row in results
-        if row.get("dataset") == dataset
-        and (row.get("algorithm") != "shell" or row.get("gap_variant") == "shell")
-    ]
+    ax.set_title(title)
+    ax.set_xlabel("n")
+    ax.set_ylabel(ylabel)
+    ax.legend(title=legend_title)
+    ax.grid(True, alpha=0.3)
+    fig.savefig(out, dpi=150, bbox_inches="tight")
+    plt.close(fig)
+    if cache is not None:
+        cache.record(out, digest)
+    return out
 
 
 def plot_metric_by_dataset(
-    results: List[dict[str, str]],
+    results: ResultTable,
     dataset: str,
     metric: str,
     label: str,
+    cache: PlotCache | None = None,
 ) -> Path | None:
     filtered = _filter_results(results, dataset)
-    if not filtered:
+    if not len(filtered):
         return None
 
-    values: Dict[Tuple[str, int], List[float]] = defaultdict(list)
-    for row in filtered:
-        algo = row["algorithm"]
-        n = int(row["n"])
-        values[(algo, n)].append(float(row[metric]))
-
-    algos = sorted({row["algorithm"] for row in filtered})
-    fig, ax = plt.subplots()
-    for algo in algos:
-        ns = sorted({n for (a, n) in values.keys() if a == algo})
-        avg_vals = [mean(values[(algo, n)]) for n in ns]
-        ax.plot(ns, avg_vals, marker="o", label=algo)
-
-    ax.set_title(f"Average {label} vs N ({dataset} dataset)")
-    ax.set_xlabel("n")
-    ax.set_ylabel(label)
-    ax.legend()
-    ax.grid(True, alpha=0.3)
-
     out_dir = TIME_DIR if metric == "time_ms" else METRICS_DIR
     out = out_dir / f"{metric}_{dataset}_all_algos.png"
-    fig.savefig(out, dpi=150, bbox_inches="tight")
-    plt.close(fig)
-    return out
+    title = f"Average {label} vs N ({dataset} dataset)"
+    return _plot(_series(filtered, "algorithm", metric), out, title, label, None, cache)
 
 
 def plot_shell_gap_comparison(
-    rows: List[dict[str, object]],
+    rows: ResultTable,
     dataset: str | None = None,
+    cache: PlotCache | None = None,
 ) -> Path | None:
-    if not rows:
+    if not len(rows):
         return None
 
-    datasets = sorted({row["dataset"] for row in rows if "dataset" in row})
+    datasets = rows.unique("dataset") if "dataset" in rows.columns else []
     dataset = dataset or ("random" if "random" in datasets else (datasets[0] if datasets else ""))
-    filtered = [row for row in rows if (not dataset or row.get("dataset") == dataset)]
-    if not filtered:
+    filtered = rows.where(dataset=dataset) if dataset else rows
+    if not len(filtered):
         filtered = rows
-        dataset = dataset or filtered[0].get("dataset", "")
-
-    times: Dict[Tuple[str, int], List[float]] = defaultdict(list)
-    for row in filtered:
-        variant = str(row.get("gap_variant", ""))
-        n = int(row.get("n", 0))
-        times[(variant, n)].append(float(row.get("time_ms", 0.0)))
-
-    variants = sorted({v for (v, _) in times.keys()})
-    fig, ax = plt.subplots()
-    for variant in variants:
-        ns = sorted({n for (v, n) in times.keys() if v == variant})
-        avg_times = [mean(times[(variant, n)]) for n in ns]
-        label = variant or "(none)"
-        ax.plot(ns, avg_times, marker="o", label=label)
 
     title = "Shell Sort Gap Comparison"
     if dataset:
         title += f" ({dataset} dataset)"
-    ax.set_title(title)
-    ax.set_xlabel("n")
-    ax.set_ylabel("time_ms")
-    ax.legend(title="gap_variant")
-    ax.grid(True, alpha=0.3)
-
     suffix = f"_{dataset}" if dataset else ""
     out = SHELL_DIR / f"shell_gap_comparison{suffix}.png"
-    fig.savefig(out, dpi=150, bbox_inches="tight")
-    plt.close(fig)
-    return out
+    series = _series(filtered, "gap_variant", "time_ms")
+    return _plot(series, out, title, "time_ms", "gap_variant", cache)
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Generate benchmark plots")
+    parser.add_argument("--force", action="store_true", help="redraw plots even if unchanged")
+    return parser.parse_args()
 
 
 if __name__ == "__main__":
-    results_csv = _load_results_csv(BENCH_DIR / "results.csv")
-    if not results_csv:
-        results_csv = _load_results_csv(RESULTS_DIR / "results.csv")
+    args = _parse_args()
+    cache = PlotCache(MANIFEST, force=args.force)
 
-    shell_json = _load_shell_json(BENCH_DIR / "shell.json")
-    if not shell_json:
-        shell_json = _load_shell_json(RESULTS_DIR / "shell.json")
-    datasets = sorted({row["dataset"] for row in results_csv})
+    results = _load_table(BENCH_DIR / "results.csv")
+    if not len(results):
+        results = _load_table(RESULTS_DIR / "results.csv")
 
+    shell = _load_table(BENCH_DIR / "shell.json")
+    if not len(shell):
+        shell = _load_table(RESULTS_DIR / "shell.json")
+
+    datasets = results.unique("dataset") if len(results) else []
     for dataset in datasets:
-        plot_metric_by_dataset(results_csv, dataset, "time_ms", "time_ms")
-        plot_metric_by_dataset(results_csv, dataset, "comparisons", "comparisons")
-        plot_metric_by_dataset(results_csv, dataset, "swaps", "swaps")
-        plot_metric_by_dataset(results_csv, dataset, "writes", "writes")
+        plot_metric_by_dataset(results, dataset, "time_ms", "time_ms", cache)
+        plot_metric_by_dataset(results, dataset, "comparisons", "comparisons", cache)
+        plot_metric_by_dataset(results, dataset, "swaps", "swaps", cache)
+        plot_metric_by_dataset(results, dataset, "writes", "writes", cache)
+
+    for dataset in shell.unique("dataset") if "dataset" in shell.columns else []:
+        plot_shell_gap_comparison(shell, dataset=dataset, cache=cache)
 
-    for dataset in sorted({row.get("dataset") for row in shell_json if "dataset" in row}):
-        plot_shell_gap_comparison(shell_json, dataset=dataset)
+    cache.save()
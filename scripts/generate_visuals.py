@@ -18,6 +18,7 @@ from datasets import available_datasets, generate
 from instrumentation import Event, Instrumentation
 from sorts import ALGORITHMS
 from sorts.gaps import available_variants
+from trace_compression import TraceReplay
 
 BASE_COLOR = "#4C78A8"
 COMPARE_COLOR = "#F58518"
@@ -68,7 +69,7 @@ def save_gif(
     title: str,
     fps: int = 30,
 ) -> None:
-    events_list = list(events)
+    events_list = TraceReplay(events)
     data = list(initial)
 
     fig, ax = plt.subplots()
@@ -122,9 +123,9 @@ def save_snapshot(
     steps: int = 200,
 ) -> None:
     data = list(initial)
-    events_list = list(events)
-    for event in events_list[:steps]:
-        apply_event(data, event)
+    events_list = TraceReplay(events)
+    for step in range(min(steps, len(events_list))):
+        apply_event(data, events_list[step])
 
     fig, ax = plt.subplots()
     ax.set_title(title)
@@ -0,0 +1,220 @@
+from __future__ import annotations
+
+import argparse
+import json
+import platform
+import sys
+import time
+from pathlib import Path
+from typing import Callable, Dict, List, Optional, Tuple
+
+ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(ROOT))
+
+from datasets import generate
+from instrumentation import EveryKth, Event, Instrumentation, KindFilter
+from sorts import ALGORITHMS, odd_even
+from sorts.gaps import available_variants
+from trace_compression import TraceCompressor
+
+BASELINE = ROOT / "results" / "microbench" / "baseline.json"
+DEFAULT_OUT = ROOT / "results" / "microbench" / "latest.json"
+
+
+def _sink_modes() -> Dict[str, Callable[[], Instrumentation]]:
+    """Instrumentation set-ups to measure, from cheapest to most expensive."""
+
+    def list_sink(sampler=None) -> Instrumentation:
+        events: List[Event] = []
+        return Instrumentation(event_sink=events.append, sampler=sampler)
+
+    def compressed() -> Instrumentation:
+        events: List[Event] = []
+        return Instrumentation(event_sink=TraceCompressor(events.append))
+
+    return {
+        "no_sink": Instrumentation,
+        "list_sink": list_sink,
+        "every16_sink": lambda: list_sink(EveryKth(16)),
+        "swap_write_sink": lambda: list_sink(KindFilter({"swap", "write"})),
+        "compressed_sink": compressed,
+    }
+
+
+def _ops() -> Dict[str, Callable[[Instrumentation, List[int], int], None]]:
+    # Index patterns mimic the kernels: a shifting insertion-style walk.
+    def compare(inst: Instrumentation, arr: List[int], k: int) -> None:
+        inst.compare(arr[k], arr[k + 1], k, k + 1, op="gt")
+
+    def swap(inst: Instrumentation, arr: List[int], k: int) -> None:
+        inst.swap(arr, k, k + 1)
+
+    def write(inst: Instrumentation, arr: List[int], k: int) -> None:
+        inst.write(arr, k, arr[k + 1])
+
+    def emit(inst: Instrumentation, arr: List[int], k: int) -> None:
+        inst._emit("write", (k,), value=k)
+
+    return {"compare": compare, "swap": swap, "write": write, "_emit": emit}
+
+
+def _best_ns(run: Callable[[], int], repeat: int) -> float:
+    """Best-of-``repeat`` nanoseconds per operation; ``run`` returns its op count."""
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter_ns()
+        ops = run()
+        elapsed = time.perf_counter_ns() - start
+        best = min(best, elapsed / max(ops, 1))
+    return best
+
+
+def bench_instrumentation(ops: int, repeat: int) -> Dict[str, float]:
+    width = 1024
+    arr = list(range(width + 1))
+    indices = [k % width for k in range(ops)]
+
+    def loop_only() -> int:
+        for k in indices:
+            pass
+        return ops
+
+    overhead = _best_ns(loop_only, repeat)
+    results: Dict[str, float] = {}
+    for mode, make_inst in _sink_modes().items():
+        for op_name, op in _ops().items():
+
+            def run() -> int:
+                inst = make_inst()
+                for k in indices:
+                    op(inst, arr, k)
+                return ops
+
+            results[f"{mode}.{op_name}"] = round(max(_best_ns(run, repeat) - overhead, 0.0), 2)
+    return results
+
+
+def _kernel_cases() -> List[Tuple[str, str, Dict[str, str]]]:
+    """(name, algorithm, kwargs) for every kernel configuration worth timing."""
+    cases = []
+    for algo in sorted(ALGORITHMS.keys()):
+        if algo == "shell":
+            cases.extend(
+                (f"shell.{variant}", algo, {"gap_variant": variant})
+                for variant in available_variants()
+            )
+        elif algo == "odd_even":
+            # Python vs NumPy shows what vectorizing a quadratic kernel buys.
+            backends = ["python"] + (["numpy"] if odd_even._numpy() is not None else [])
+            cases.extend(
+                (f"odd_even.{backend}", algo, {"backend": backend}) for backend in backends
+            )
+        else:
+            cases.append((algo, algo, {}))
+    return cases
+
+
+def bench_kernels(n: int, repeat: int, dataset: str = "random") -> Dict[str, float]:
+    data = generate(dataset, n, 12345)
+    results: Dict[str, float] = {}
+    for name, algo, kwargs in _kernel_cases():
+        best = float("inf")
+        for _ in range(repeat):
+            arr = list(data)
+            inst = Instrumentation()
+            start = time.perf_counter()
+            ALGORITHMS[algo](arr, inst, **kwargs)
+            best = min(best, time.perf_counter() - start)
+        results[name] = round(n / best, 1)
+    return results
+
+
+def run_suite(ops: int, n: int, repeat: int) -> Dict[str, object]:
+    return {
+        "meta": {
+            "python": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "machine": platform.machine(),
+            "ops": ops,
+            "n": n,
+            "repeat": repeat,
+        },
+        "instrumentation_ns_per_op": bench_instrumentation(ops, repeat),
+        "kernel_elements_per_sec": bench_kernels(n, repeat),
+    }
+
+
+def compare_results(
+    baseline: Dict[str, object],
+    current: Dict[str, object],
+    threshold: float,
+) -> List[str]:
+    """Print a side-by-side table and return the names of regressed entries."""
+    regressions: List[str] = []
+    # Lower is better for ns/op, higher is better for throughput.
+    sections = (("instrumentation_ns_per_op", False), ("kernel_elements_per_sec", True))
+    for section, higher_is_better in sections:
+        old = baseline.get(section, {})
+        new = current.get(section, {})
+        print(f"\n{section}")
+        print(f"{'name':32} {'baseline':>12} {'current':>12} {'change':>8}")
+        for name in sorted(set(old) | set(new)):
+            if name not in old or name not in new:
+                print(f"{name:32} {old.get(name, '-'):>12} {new.get(name, '-'):>12}")
+                continue
+            before, after = float(old[name]), float(new[name])
+            change = (after - before) / before if before else 0.0
+            worse = -change if higher_is_better else change
+            flag = " !" if worse > threshold else ""
+            if flag:
+                regressions.append(f"{section}.{name}")
+            print(f"{name:32} {before:>12.2f} {after:>12.2f} {change:>+7.1%}{flag}")
+    return regressions
+
+
+def _parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(
+        description="Microbenchmarks for Instrumentation and the sort kernels"
+    )
+    parser.add_argument("--ops", type=int, default=200_000, help="calls per instrumentation op")
+    parser.add_argument("--n", type=int, default=1000, help="input size for kernel throughput")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--quick", action="store_true", help="small sizes for smoke runs")
+    parser.add_argument("--out", default=str(DEFAULT_OUT), help="where to write the JSON results")
+    parser.add_argument("--compare", default=None, help="baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=0.10, help="regression tolerance")
+    parser.add_argument("--fail-on-regression", action="store_true")
+    args = parser.parse_args(argv)
+    if args.compare and Path(args.compare).resolve() == Path(args.out).resolve():
+        parser.error("--out must differ from --compare, or the baseline is overwritten")
+    return args
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = _parse_args(argv)
+    if args.quick:
+        args.ops, args.n, args.repeat = 20_000, 200, 3
+
+    # Read the baseline first: a missing file fails fast, and nothing written
+    # below can change what is compared against.
+    baseline = None
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+
+    results = run_suite(args.ops, args.n, args.repeat)
+    out = Path(args.out)
+    out.parent.mkdir(parents=True, exist_ok=True)
+    out.write_text(json.dumps(results, indent=2) + "\n", encoding="utf-8")
+    print(f"Wrote microbenchmark results to {out}")
+
+    if baseline is not None:
+        regressions = compare_results(baseline, results, args.threshold)
+        if regressions:
+            print(f"\n{len(regressions)} regressions beyond {args.threshold:.0%}")
+            if args.fail_on_regression:
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
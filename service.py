@@ -0,0 +1,498 @@
+from __future__ import annotations
+
+import itertools
+import json
+import queue
+import threading
+from collections import OrderedDict
+from dataclasses import asdict, dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Generator, Iterator, List, Optional
+
+import benchmark
+from datasets import available_datasets, available_element_types, generate
+from instrumentation import Event, parse_sampler
+from sorts import ALGORITHMS
+from sorts.gaps import available_variants
+from trace_compression import record_trace
+
+
+class DatasetCache:
+    """LRU cache of generated datasets shared by all service workers."""
+
+    def __init__(self, max_entries: int = 256) -> None:
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[tuple[str, int, int, str], List[Any]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def generate(self, name: str, n: int, seed: int, element_type: str = "int") -> List[Any]:
+        key = (name, n, seed, element_type)
+        with self._lock:
+            cached = self._entries.get(key)
+            if cached is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return list(cached)
+            self.misses += 1
+
+        data = generate(name, n, seed, element_type)
+        with self._lock:
+            self._entries[key] = list(data)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return data
+
+
+class JobCancelled(Exception):
+    def __init__(self) -> None:
+        super().__init__("cancelled: server is shutting down")
+
+
+class RowLimitExceeded(Exception):
+    def __init__(self, limit: int) -> None:
+        super().__init__(
+            f"more than {limit} rows with no reader attached; "
+            "stream the rows while the job runs, or sample or compress the trace"
+        )
+
+
+class RowsReleased(LookupError):
+    def __init__(self, job_id: int) -> None:
+        super().__init__(f"rows of job {job_id} were already streamed and released")
+
+
+@dataclass
+class Job:
+    """A queued bench or trace job and the rows it has produced so far.
+
+    Rows are kept until they are streamed. While a reader is attached, the
+    worker blocks once ``max_rows`` rows are buffered and rows every reader
+    has seen are freed, except the first ``keep_first`` (a trace's initial
+    array). With no reader attached, going past ``max_rows`` fails the job
+    instead. Rows are never skipped: once any have been freed, new readers
+    get :class:`RowsReleased`.
+    """
+
+    id: int
+    kind: str
+    params: dict[str, Any]
+    priority: int = 0
+    status: str = "queued"
+    error: Optional[str] = None
+    rows: List[dict[str, Any]] = field(default_factory=list)
+    max_rows: Optional[int] = None
+    keep_first: int = 0
+    released: int = 0
+    _readers: dict[int, int] = field(default_factory=dict, repr=False)
+    _reader_ids: Iterator[int] = field(default_factory=itertools.count, repr=False)
+    _cancelled: bool = False
+    _cond: threading.Condition = field(default_factory=threading.Condition, repr=False)
+
+    @property
+    def done(self) -> bool:
+        return self.status in ("done", "failed")
+
+    @property
+    def total_rows(self) -> int:
+        return self.released + len(self.rows)
+
+    def _release_seen(self) -> None:
+        seen = min(self._readers.values()) - self.keep_first - self.released
+        if seen > 0:
+            del self.rows[self.keep_first : self.keep_first + seen]
+            self.released += seen
+
+    def append(self, row: dict[str, Any]) -> None:
+        with self._cond:
+            while self.max_rows is not None and len(self.rows) >= self.max_rows:
+                if self._cancelled:
+                    raise JobCancelled()
+                if not self._readers:
+                    raise RowLimitExceeded(self.max_rows)
+                self._release_seen()
+                if len(self.rows) < self.max_rows:
+                    break
+                self._cond.wait()
+            if self._cancelled:
+                raise JobCancelled()
+            self.rows.append(row)
+            self._cond.notify_all()
+
+    def cancel(self) -> None:
+        """Make the worker's next :meth:`append` raise :class:`JobCancelled`."""
+        with self._cond:
+            self._cancelled = True
+            self._cond.notify_all()
+
+    def finish(self, error: Optional[str] = None) -> None:
+        with self._cond:
+            self.status = "failed" if error else "done"
+            self.error = error
+            self._cond.notify_all()
+
+    def release(self) -> None:
+        """Free the rows of a finished job nobody is reading; the row count remains."""
+        with self._cond:
+            if self.done and not self._readers:
+                self.released += len(self.rows)
+                self.rows = []
+
+    def iter_rows(self) -> Generator[dict[str, Any], None, None]:
+        """Yield every row as the job produces it, blocking until it finishes.
+
+        Raises :class:`RowsReleased` at once if some rows are already gone.
+        """
+        with self._cond:
+            if self.released:
+                raise RowsReleased(self.id)
+        return self._follow()
+
+    def _follow(self) -> Generator[dict[str, Any], None, None]:
+        with self._cond:
+            if self.released:
+                raise RowsReleased(self.id)
+            reader = next(self._reader_ids)
+            self._readers[reader] = 0
+        try:
+            index = 0
+            while True:
+                with self._cond:
+                    while index >= self.total_rows and not self.done:
+                        self._cond.wait()
+                    # Freed rows all lie behind every attached reader.
+                    pending = self.rows[index - self.released :]
+                    finished = self.done
+                for row in pending:
+                    yield row
+                index += len(pending)
+                with self._cond:
+                    self._readers[reader] = index
+                    self._cond.notify_all()
+                if finished and index >= self.total_rows:
+                    return
+        finally:
+            with self._cond:
+                del self._readers[reader]
+                self._cond.notify_all()
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "id": self.id,
+            "kind": self.kind,
+            "priority": self.priority,
+            "status": self.status,
+            "error": self.error,
+            "rows": self.total_rows,
+            "params": self.params,
+        }
+
+
+def _bench_params(params: dict[str, Any]) -> dict[str, Any]:
+    algorithms = params.get("algorithms") or sorted(ALGORITHMS.keys())
+    sizes = params.get("sizes") or benchmark.default_sizes()
+    datasets = params.get("datasets") or benchmark.default_datasets()
+    gap_variants = params.get("gap_variants") or available_variants()
+    element_types = params.get("element_types") or ["int"]
+    for algo in algorithms:
+        if algo not in ALGORITHMS:
+            raise ValueError(f"Unknown algorithm: {algo}")
+    for dataset in datasets:
+        if dataset not in available_datasets():
+            raise ValueError(f"Unknown dataset: {dataset}")
+    for variant in gap_variants:
+        if variant not in available_variants():
+            raise ValueError(f"Unknown gap variant: {variant}")
+    for element_type in element_types:
+        if element_type not in available_element_types():
+            raise ValueError(f"Unknown element type: {element_type}")
+    return {
+        "algorithms": list(algorithms),
+        "sizes": [int(n) for n in sizes],
+        "datasets": list(datasets),
+        "trials": int(params.get("trials", 5)),
+        "base_seed": int(params.get("seed", 0)),
+        "gap_variants": list(gap_variants),
+        "element_types": list(element_types),
+    }
+
+
+def _trace_params(params: dict[str, Any]) -> dict[str, Any]:
+    algo = params.get("algo")
+    dataset = params.get("dataset", "random")
+    gap = params.get("gap", "shell")
+    if algo not in ALGORITHMS:
+        raise ValueError(f"Unknown algorithm: {algo}")
+    if dataset not in available_datasets():
+        raise ValueError(f"Unknown dataset: {dataset}")
+    if gap not in available_variants():
+        raise ValueError(f"Unknown gap variant: {gap}")
+    if params.get("sample"):
+        parse_sampler(params["sample"])
+    return {
+        "algo": algo,
+        "n": int(params.get("n", 50)),
+        "seed": int(params.get("seed", 0)),
+        "dataset": dataset,
+        "gap": gap,
+        "compress": bool(params.get("compress", False)),
+        "sample": params.get("sample"),
+    }
+
+
+class BenchmarkService:
+    """Priority job queue served by long-lived worker threads.
+
+    Workers keep the interpreter, imported kernels and the dataset cache warm
+    between jobs. Jobs with a higher ``priority`` run first; ties run in
+    submission order. Only the ``max_finished_jobs`` most recent finished
+    jobs are remembered, and each job buffers at most ``max_job_rows`` rows
+    (see :class:`Job`).
+    """
+
+    def __init__(
+        self,
+        workers: int = 1,
+        cache_size: int = 256,
+        max_finished_jobs: int = 100,
+        max_job_rows: Optional[int] = 100_000,
+    ) -> None:
+        self.cache = DatasetCache(cache_size)
+        self.max_finished_jobs = max_finished_jobs
+        self.max_job_rows = max_job_rows
+        self._stopping = threading.Event()
+        self._queue: queue.PriorityQueue[tuple[int, int, Optional[Job]]] = queue.PriorityQueue()
+        self._jobs: dict[int, Job] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"bench-worker-{i}", daemon=True)
+            for i in range(max(1, workers))
+        ]
+
+    def start(self) -> None:
+        for thread in self._threads:
+            thread.start()
+
+    def stop(self) -> None:
+        """Cancel running and queued jobs and wait for the workers to exit."""
+        self._stopping.set()
+        for job in self.jobs():
+            if not job.done:
+                job.cancel()
+        # Sentinels sort ahead of every job, so workers exit at once.
+        for index, _ in enumerate(self._threads):
+            self._queue.put((-(2**62), index, None))
+        for thread in self._threads:
+            thread.join()
+        while True:
+            try:
+                _, _, job = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if job is not None:
+                job.finish(error=str(JobCancelled()))
+
+    def submit(self, kind: str, params: dict[str, Any], priority: int = 0) -> Job:
+        if kind == "bench":
+            params = _bench_params(params)
+        elif kind == "trace":
+            params = _trace_params(params)
+        else:
+            raise ValueError(f"Unknown job kind: {kind}")
+
+        with self._lock:
+            job_id = next(self._ids)
+            job = Job(
+                id=job_id,
+                kind=kind,
+                params=params,
+                priority=priority,
+                max_rows=self.max_job_rows,
+                # A trace cannot be replayed without its initial array.
+                keep_first=1 if kind == "trace" else 0,
+            )
+            self._jobs[job_id] = job
+        self._queue.put((-priority, job_id, job))
+        return job
+
+    def get(self, job_id: int) -> Optional[Job]:
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self) -> List[Job]:
+        with self._lock:
+            return list(self._jobs.values())
+
+    def _work(self) -> None:
+        while True:
+            _, _, job = self._queue.get()
+            if job is None:
+                return
+            job.status = "running"
+            try:
+                if job.kind == "bench":
+                    self._run_bench(job)
+                else:
+                    self._run_trace(job)
+            except JobCancelled as exc:
+                job.finish(error=str(exc))
+            except Exception as exc:  # reported to the client, worker stays up
+                job.finish(error=f"{type(exc).__name__}: {exc}")
+            else:
+                job.finish()
+            self._evict_finished()
+
+    def _evict_finished(self) -> None:
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if job.done]
+            for job_id in finished[: max(0, len(finished) - self.max_finished_jobs)]:
+                del self._jobs[job_id]
+
+    def _check_stopping(self) -> None:
+        if self._stopping.is_set():
+            raise JobCancelled()
+
+    def _run_bench(self, job: Job) -> None:
+        for row in benchmark.iter_benchmarks(generate_fn=self.cache.generate, **job.params):
+            self._check_stopping()
+            job.append(row)
+
+    def _run_trace(self, job: Job) -> None:
+        params = job.params
+        data = self.cache.generate(params["dataset"], params["n"], params["seed"])
+        job.append({"kind": "initial", "data": list(data)})
+
+        def sink(event: Event) -> None:
+            self._check_stopping()
+            job.append(asdict(event))
+
+        sampler = parse_sampler(params["sample"]) if params["sample"] else None
+        record_trace(
+            ALGORITHMS[params["algo"]],
+            data,
+            sink,
+            sampler=sampler,
+            compress_runs=params["compress"],
+            gap_variant=params["gap"],
+        )
+
+
+class _Handler(BaseHTTPRequestHandler):
+    server: "BenchmarkHTTPServer"
+
+    def log_message(self, format: str, *args: Any) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send_json(self, status: int, payload: object) -> None:
+        body = json.dumps(payload).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _job_from_path(self, parts: List[str]) -> Optional[Job]:
+        try:
+            job_id = int(parts[1])
+        except (IndexError, ValueError):
+            return None
+        return self.server.service.get(job_id)
+
+    def do_GET(self) -> None:
+        parts = [part for part in self.path.split("?")[0].split("/") if part]
+        service = self.server.service
+        if parts == ["health"]:
+            self._send_json(
+                200,
+                {
+                    "status": "ok",
+                    "cache_hits": service.cache.hits,
+                    "cache_misses": service.cache.misses,
+                },
+            )
+            return
+        if parts == ["jobs"]:
+            self._send_json(200, [job.snapshot() for job in service.jobs()])
+            return
+        if parts and parts[0] == "jobs":
+            job = self._job_from_path(parts)
+            if job is None:
+                self._send_json(404, {"error": "unknown job"})
+                return
+            if len(parts) == 2:
+                self._send_json(200, job.snapshot())
+                return
+            if len(parts) == 3 and parts[2] == "rows":
+                self._stream_rows(job)
+                return
+        self._send_json(404, {"error": "not found"})
+
+    def do_POST(self) -> None:
+        if self.path.split("?")[0].rstrip("/") != "/jobs":
+            self._send_json(404, {"error": "not found"})
+            return
+        try:
+            length = int(self.headers.get("Content-Length", 0))
+            payload = json.loads(self.rfile.read(length) or b"{}")
+            job = self.server.service.submit(
+                kind=str(payload.get("kind", "bench")),
+                params=dict(payload.get("params", {})),
+                priority=int(payload.get("priority", 0)),
+            )
+        except (ValueError, TypeError, AttributeError) as exc:
+            self._send_json(400, {"error": str(exc)})
+            return
+        self._send_json(202, job.snapshot())
+
+    def _stream_rows(self, job: Job) -> None:
+        try:
+            rows = job.iter_rows()
+        except RowsReleased as exc:
+            self._send_json(410, {"error": str(exc)})
+            return
+        # HTTP/1.0 response: no Content-Length, the connection closes at the end.
+        self.send_response(200)
+        self.send_header("Content-Type", "application/x-ndjson")
+        self.end_headers()
+        try:
+            for row in rows:
+                self.wfile.write(json.dumps(row).encode("utf-8") + b"\n")
+                self.wfile.flush()
+        finally:
+            # Detach at once if the client goes away, so the worker isn't held up.
+            rows.close()
+        trailer = {"job": job.id, "status": job.status, "error": job.error, "rows": job.total_rows}
+        self.wfile.write(json.dumps(trailer).encode("utf-8") + b"\n")
+        job.release()
+
+
+class BenchmarkHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: tuple[str, int],
+        service: BenchmarkService,
+        verbose: bool = False,
+    ) -> None:
+        super().__init__(address, _Handler)
+        self.service = service
+        self.verbose = verbose
+
+
+def serve(host: str = "127.0.0.1", port: int = 8765, workers: int = 1, verbose: bool = True) -> None:
+    service = BenchmarkService(workers=workers)
+    service.start()
+    server = BenchmarkHTTPServer((host, port), service, verbose=verbose)
+    print(f"Serving benchmark jobs on http://{host}:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+        service.stop()
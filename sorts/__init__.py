@@ -1,13 +1,27 @@
 from __future__ import annotations
 
-from sorts import bubble, insertion, selection, shell
+from sorts import auto, bubble, external, insertion, odd_even, parallel, selection, shell
 from sorts.gaps import available_variants, get_gaps
 
 ALGORITHMS = {
+    "auto": auto.sort,
     "bubble": bubble.sort,
+    "external": external.sort,
     "insertion": insertion.sort,
+    "odd_even": odd_even.sort,
+    "parallel": parallel.sort,
     "selection": selection.sort,
     "shell": shell.sort,
 }
 
-__all__ = ["ALGORITHMS", "available_variants", "get_gaps"]
+# Element types an algorithm can sort; algorithms not listed handle all of them.
+ELEMENT_TYPES = {
+    "external": ("int",),
+}
+
+
+def supports(algorithm: str, element_type: str) -> bool:
+    return element_type in ELEMENT_TYPES.get(algorithm, (element_type,))
+
+
+__all__ = ["ALGORITHMS", "ELEMENT_TYPES", "available_variants", "get_gaps", "supports"]
@@ -0,0 +1,49 @@
+from __future__ import annotations
+
+import time
+from typing import Any, Dict, Tuple
+
+from instrumentation import Instrumentation
+from presortedness import DEFAULT_SAMPLES, Presortedness, measure
+from sorts.gaps import get_gaps
+from sorts.keys import with_key
+
+SHELL_GAPS = "tokuda"
+# Below this size insertion sort wins on any input and probing isn't worth it.
+SMALL_INPUT = 16
+
+
+def choose(probe: Presortedness) -> Tuple[str, Dict[str, Any]]:
+    """Pick the kernel with the lower predicted comparison count.
+
+    Insertion sort does about ``n + inversions`` comparisons. Shell sort
+    with Tokuda gaps does between 1x and 2x ``n`` per gap pass whatever the
+    input order, so 1.5x is used as its estimate.
+    """
+    n = probe.n
+    shell_cost = 1.5 * n * max(1, len(get_gaps(SHELL_GAPS, n)))
+    if n + probe.inversions <= shell_cost:
+        return "insertion", {}
+    return "shell", {"gap_variant": SHELL_GAPS}
+
+
+@with_key
+def sort(arr: list[Any], inst: Instrumentation, **_: object) -> list[Any]:
+    """Probe presortedness, then run insertion or shell (Tokuda gaps).
+
+    The probe takes at most one sample per element and is not counted. Its
+    cost is reported as ``dispatch_ms`` in ``inst.stats``, together with the
+    choice (``auto_choice``).
+    """
+    from sorts import ALGORITHMS
+
+    start = time.perf_counter()
+    n = len(arr)
+    if n <= SMALL_INPUT:
+        algo, kwargs = "insertion", {}
+    else:
+        algo, kwargs = choose(measure(arr, samples=min(DEFAULT_SAMPLES, n)))
+    dispatch_ms = (time.perf_counter() - start) * 1000
+    inst.stats["auto_choice"] = f"{algo}.{kwargs['gap_variant']}" if kwargs else algo
+    inst.stats["dispatch_ms"] = round(dispatch_ms, 4)
+    return ALGORITHMS[algo](arr, inst, **kwargs)
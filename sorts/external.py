@@ -0,0 +1,48 @@
+from __future__ import annotations
+
+import os
+import tempfile
+from typing import Any, Callable, Optional
+
+from instrumentation import Instrumentation
+
+
+def sort(
+    arr: list[Any],
+    inst: Instrumentation,
+    chunk_items: int = 1024,
+    fan_in: int = 8,
+    buffer_items: int = 256,
+    kernel: str = "shell",
+    gap_variant: str = "tokuda",
+    key: Optional[Callable[[Any], Any]] = None,
+    **_: object,
+) -> list[Any]:
+    """Run ``arr`` through the external-memory pipeline in :mod:`extsort`.
+
+    The list is staged to a temporary int64 file (not counted in the I/O
+    stats) and read back when the sort finishes. The small defaults make
+    benchmark sizes spill several runs and need more than one merge pass.
+    Chunk events are not traced. Only plain integers are supported.
+    """
+    from extsort import external_sort, read_ints, write_ints
+
+    if key is not None or not all(type(value) is int for value in arr):
+        raise ValueError("external sort only handles int64 values without a key")
+    with tempfile.TemporaryDirectory(prefix="extsort-") as scratch:
+        src = os.path.join(scratch, "input.bin")
+        dst = os.path.join(scratch, "output.bin")
+        write_ints(src, arr)
+        external_sort(
+            src,
+            dst,
+            inst,
+            chunk_items=chunk_items,
+            fan_in=fan_in,
+            buffer_items=buffer_items,
+            kernel=kernel,
+            gap_variant=gap_variant or "tokuda",
+            tmp_dir=scratch,
+        )
+        arr[:] = read_ints(dst)
+    return arr
@@ -1,9 +1,13 @@
 from __future__ import annotations
 
+from typing import Any
+
 from instrumentation import Instrumentation
+from sorts.keys import with_key
 
 
-def sort(arr: list[int], inst: Instrumentation, **_: object) -> list[int]:
+@with_key
+def sort(arr: list[Any], inst: Instrumentation, **_: object) -> list[Any]:
     n = len(arr)
     for i in range(1, n):
         key = arr[i]
@@ -0,0 +1,66 @@
+from __future__ import annotations
+
+from functools import wraps
+from typing import Any, Callable, List, Optional
+
+from instrumentation import Instrumentation
+
+SortFn = Callable[..., List[Any]]
+
+
+class Keyed:
+    """An element paired with its precomputed key; compares by key only."""
+
+    __slots__ = ("key", "value")
+
+    def __init__(self, key: Any, value: Any) -> None:
+        self.key = key
+        self.value = value
+
+    def __lt__(self, other: "Keyed") -> bool:
+        return self.key < other.key
+
+    def __gt__(self, other: "Keyed") -> bool:
+        return self.key > other.key
+
+    def __le__(self, other: "Keyed") -> bool:
+        return self.key <= other.key
+
+    def __ge__(self, other: "Keyed") -> bool:
+        return self.key >= other.key
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, Keyed) and self.key == other.key
+
+    def __ne__(self, other: object) -> bool:
+        return not self == other
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"Keyed({self.key!r}, {self.value!r})"
+
+
+def with_key(sort_fn: SortFn) -> SortFn:
+    """Add a ``key=`` argument to a kernel via decorate-sort-undecorate.
+
+    Keys are computed once per element, the kernel sorts the decorated list
+    (so comparisons, swaps and writes are counted as usual), and the original
+    elements are copied back into ``arr`` in sorted order.
+    """
+
+    @wraps(sort_fn)
+    def wrapper(
+        arr: List[Any],
+        inst: Instrumentation,
+        key: Optional[Callable[[Any], Any]] = None,
+        **kwargs: Any,
+    ) -> List[Any]:
+        if key is None:
+            return sort_fn(arr, inst, **kwargs)
+        decorated = [Keyed(key(value), value) for value in arr]
+        sort_fn(decorated, inst, **kwargs)
+        arr[:] = [item.value for item in decorated]
+        return arr
+
+    return wrapper
@@ -0,0 +1,56 @@
+from __future__ import annotations
+
+import heapq
+from typing import Any, Iterable, Iterator, List, Sequence
+
+from instrumentation import Instrumentation
+
+
+class _Head:
+    """Current front of one sorted run; orders by value, then by run index."""
+
+    __slots__ = ("value", "run", "inst")
+
+    def __init__(self, value: Any, run: int, inst: Instrumentation) -> None:
+        self.value = value
+        self.run = run
+        self.inst = inst
+
+    def __lt__(self, other: "_Head") -> bool:
+        # One counted comparison per heap step; ties go to the earlier run,
+        # which keeps the merge stable.
+        op = "le" if self.run < other.run else "lt"
+        return self.inst.compare(self.value, other.value, op=op)
+
+
+def iter_merge(runs: Sequence[Iterable[Any]], inst: Instrumentation) -> Iterator[Any]:
+    """Lazily yield the stable k-way merge of sorted ``runs``.
+
+    Runs are consumed one element at a time, so they can be streamed from
+    disk. Comparisons are counted without events, since they span runs.
+    """
+    iterators = [iter(run) for run in runs]
+    heap = []
+    for index, iterator in enumerate(iterators):
+        for value in iterator:
+            heap.append(_Head(value, index, inst))
+            break
+    heapq.heapify(heap)
+    while heap:
+        head = heap[0]
+        yield head.value
+        for value in iterators[head.run]:
+            heapq.heapreplace(heap, _Head(value, head.run, inst))
+            break
+        else:
+            heapq.heappop(heap)
+
+
+def merge_runs(runs: Sequence[Sequence[Any]], out: List[Any], inst: Instrumentation) -> List[Any]:
+    """Stable k-way merge of sorted ``runs`` into ``out[0:total]``.
+
+    Every placed element is an instrumented write into ``out``.
+    """
+    for k, value in enumerate(iter_merge(runs, inst)):
+        inst.write(out, k, value)
+    return out
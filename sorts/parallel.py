@@ -0,0 +1,179 @@
+from __future__ import annotations
+
+import atexit
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+from instrumentation import Event, Instrumentation
+from sorts.keys import with_key
+from sorts.merge import merge_runs
+
+Counters = Tuple[int, int, int]
+
+_pool: Optional[Tuple[int, ProcessPoolExecutor]] = None
+# Service workers sort on several threads; one pooled sort runs at a time so
+# none can replace or shut down the pool while another is using it.
+_pool_lock = threading.RLock()
+
+
+def _executor(workers: int) -> ProcessPoolExecutor:
+    """A process pool kept across calls, so benchmarks don't time worker start-up.
+
+    A new pool runs one no-op per worker before it is returned, so every
+    process is already started and has imported the kernels.
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None or _pool[0] != workers:
+            shutdown_pool()
+            pool = ProcessPoolExecutor(max_workers=workers)
+            for future in [pool.submit(_warm_up) for _ in range(workers)]:
+                future.result()
+            _pool = (workers, pool)
+        return _pool[1]
+
+
+def start_pool(workers: Optional[int] = None) -> None:
+    """Create (and warm up) the pool that ``sort(..., workers=workers)`` will use.
+
+    Call it before timing so the first timed call doesn't pay for it.
+    """
+    workers = _resolve_workers(workers)
+    if workers > 1:
+        _executor(workers)
+
+
+@atexit.register
+def shutdown_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool[1].shutdown(cancel_futures=True)
+            _pool = None
+
+
+def _warm_up() -> None:
+    import sorts  # noqa: F401
+
+
+def _resolve_workers(workers: Optional[int]) -> int:
+    return max(1, workers or os.cpu_count() or 1)
+
+
+def _chunk_kernel(size: int, kernel: str, small_kernel: str, small_threshold: int) -> str:
+    return small_kernel if size <= small_threshold else kernel
+
+
+def _sort_chunk(
+    chunk: List[Any], kernel: str, kwargs: Dict[str, Any]
+) -> Tuple[List[Any], Counters, float]:
+    """Worker entry point: sort one chunk, return it with its counters and CPU ms."""
+    from sorts import ALGORITHMS
+
+    inst = Instrumentation()
+    start = time.process_time()
+    ALGORITHMS[kernel](chunk, inst, **kwargs)
+    cpu_ms = (time.process_time() - start) * 1000
+    return chunk, (inst.comparisons, inst.swaps, inst.writes), cpu_ms
+
+
+class _Relay:
+    """Forward a chunk's events to the parent, shifted to whole-array indices."""
+
+    def __init__(self, inst: Instrumentation, offset: int) -> None:
+        self.inst = inst
+        self.offset = offset
+        self.seen: Counters = (0, 0, 0)
+
+    def sync(self, counters: Counters) -> None:
+        comparisons, swaps, writes = (new - old for new, old in zip(counters, self.seen))
+        self.inst.count(comparisons=comparisons, swaps=swaps, writes=writes)
+        self.seen = counters
+
+    def __call__(self, event: Event) -> None:
+        self.sync((event.comparisons, event.swaps, event.writes))
+        indices = tuple(index + self.offset for index in event.indices)
+        self.inst._emit(event.kind, indices, value=event.value, label=event.label)
+
+
+def _bounds(n: int, chunks: int) -> List[Tuple[int, int]]:
+    step, extra = divmod(n, chunks)
+    bounds = []
+    start = 0
+    for index in range(chunks):
+        stop = start + step + (1 if index < extra else 0)
+        bounds.append((start, stop))
+        start = stop
+    return bounds
+
+
+@with_key
+def sort(
+    arr: list[Any],
+    inst: Instrumentation,
+    workers: Optional[int] = None,
+    kernel: str = "shell",
+    gap_variant: str = "shell",
+    small_kernel: str = "insertion",
+    small_threshold: int = 32,
+    **_: object,
+) -> list[Any]:
+    """Sort one contiguous chunk per worker on a process pool, then k-way merge.
+
+    Traced runs and ``workers=1`` sort the chunks in-process instead.
+    """
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    workers = _resolve_workers(workers)
+    n = len(arr)
+    bounds = _bounds(n, min(workers, n)) if n else []
+    kwargs = {"gap_variant": gap_variant or "shell"}
+    jobs = [
+        (arr[start:stop], _chunk_kernel(stop - start, kernel, small_kernel, small_threshold))
+        for start, stop in bounds
+    ]
+
+    worker_cpu_ms = 0.0
+    runs: List[List[Any]] = []
+    if workers == 1 or inst.tracing or len(jobs) < 2:
+        from sorts import ALGORITHMS
+
+        for (chunk, chunk_kernel), (start, _) in zip(jobs, bounds):
+            relay = _Relay(inst, start)
+            child = Instrumentation(event_sink=relay if inst.tracing else None)
+            ALGORITHMS[chunk_kernel](chunk, child, **kwargs)
+            relay.sync((child.comparisons, child.swaps, child.writes))
+            runs.append(chunk)
+    else:
+        with _pool_lock:
+            pool = _executor(workers)
+            futures = [pool.submit(_sort_chunk, chunk, name, kwargs) for chunk, name in jobs]
+            results = [future.result() for future in futures]
+        for chunk, (comparisons, swaps, writes), cpu_ms in results:
+            inst.count(comparisons=comparisons, swaps=swaps, writes=writes)
+            worker_cpu_ms += cpu_ms
+            runs.append(chunk)
+
+    merge_start = time.perf_counter()
+    if len(runs) == 1:
+        arr[:] = runs[0]
+    elif runs:
+        merge_runs(runs, arr, inst)
+    merge_ms = (time.perf_counter() - merge_start) * 1000
+
+    inst.stats.update(
+        {
+            "workers": workers,
+            "chunks": len(runs),
+            "kernel": kernel,
+            "small_kernel": small_kernel,
+            "small_threshold": small_threshold,
+            "wall_ms": round((time.perf_counter() - wall_start) * 1000, 4),
+            "cpu_ms": round((time.process_time() - cpu_start) * 1000 + worker_cpu_ms, 4),
+            "merge_ms": round(merge_ms, 4),
+        }
+    )
+    return arr
@@ -1,15 +1,19 @@
 from __future__ import annotations
 
+from typing import Any
+
 from instrumentation import Instrumentation
 from sorts.gaps import get_gaps
+from sorts.keys import with_key
 
 
+@with_key
 def sort(
-    arr: list[int],
+    arr: list[Any],
     inst: Instrumentation,
     gap_variant: str = "shell",
     **_: object,
-) -> list[int]:
+) -> list[Any]:
     n = len(arr)
     gaps = get_gaps(gap_variant, n)
     for gap in gaps:
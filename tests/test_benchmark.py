@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import pytest
+
+import benchmark
+
+GRID = {
+    "algorithms": ["bubble", "insertion", "shell"],
+    "sizes": [10, 40],
+    "datasets": ["random", "reversed"],
+    "trials": 2,
+    "gap_variants": ["knuth", "shell"],
+}
+
+
+def _strip_time(rows: list[dict[str, object]]) -> list[dict[str, object]]:
+    return [{k: v for k, v in row.items() if k != "time_ms"} for row in rows]
+
+
+@pytest.mark.parametrize("count", [1, 2, 3, 5])
+def test_shards_are_disjoint_and_cover_grid(count: int) -> None:
+    cells = list(
+        benchmark.iter_cells(
+            GRID["algorithms"], GRID["sizes"], GRID["datasets"], GRID["trials"], GRID["gap_variants"]
+        )
+    )
+    shards = [benchmark.shard_cells(cells, i, count) for i in range(1, count + 1)]
+    flat = [cell for shard in shards for cell in shard]
+    assert sorted(flat) == sorted(cells)
+    assert len(flat) == len(set(flat))
+
+
+def test_shards_balance_cost() -> None:
+    cells = list(benchmark.iter_cells(["bubble", "shell"], [1000], ["random"], 8, ["shell"]))
+    loads = [
+        sum(benchmark.estimate_cost(c[0], c[4]) for c in benchmark.shard_cells(cells, i, 2))
+        for i in (1, 2)
+    ]
+    assert {c[0] for c in benchmark.shard_cells(cells, 1, 2)} == {"bubble", "shell"}
+    assert max(loads) / min(loads) < 1.1
+
+
+@pytest.mark.parametrize(
+    "kernel, expanded",
+    [
+        (None, {"shell", "parallel", "external"}),
+        ("shell", {"shell", "parallel", "external"}),
+        ("insertion", {"shell"}),
+    ],
+)
+def test_chunked_algorithms_expand_over_gaps_only_with_shell_chunks(kernel, expanded) -> None:
+    algorithms = ["bubble", "shell", "parallel", "external"]
+    cells = list(
+        benchmark.iter_cells(algorithms, [10], ["random"], 1, ["knuth", "tokuda"], kernel=kernel)
+    )
+    variants: dict[str, set[str]] = {}
+    for algo, variant, *_ in cells:
+        variants.setdefault(algo, set()).add(variant)
+    assert {algo for algo, seen in variants.items() if seen == {"knuth", "tokuda"}} == expanded
+    assert all(seen == {""} for algo, seen in variants.items() if algo not in expanded)
+
+
+@pytest.mark.parametrize("spec", ["0/2", "3/2", "1", "a/b"])
+def test_parse_shard_rejects_bad_specs(spec: str) -> None:
+    with pytest.raises(ValueError):
+        benchmark.parse_shard(spec)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".json", ".cols"])
+def test_merged_shards_equal_serial_run(tmp_path, suffix: str) -> None:
+    serial = benchmark.run_benchmarks(base_seed=11, **GRID)
+    paths = []
+    for i in (1, 2, 3):
+        path = str(tmp_path / f"shard{i}{suffix}")
+        benchmark.write_results(path, benchmark.run_benchmarks(base_seed=11, shard=(i, 3), **GRID))
+        paths.append(path)
+
+    merged = benchmark.merge_results(paths, base_seed=11, **GRID)
+    assert _strip_time(merged) == _strip_time(serial)
+
+
+@pytest.mark.parametrize("suffix", [".json", ".jsonl", ".cols"])
+def test_sparse_columns_survive_merge(tmp_path, suffix: str) -> None:
+    # external rows add integer columns (runs, passes, ...) the others lack.
+    grid = dict(GRID, algorithms=["external", "insertion"])
+    serial = benchmark.run_benchmarks(base_seed=11, **grid)
+    paths = []
+    for i in (1, 2):
+        path = str(tmp_path / f"shard{i}{suffix}")
+        benchmark.write_results(path, benchmark.run_benchmarks(base_seed=11, shard=(i, 2), **grid))
+        paths.append(path)
+
+    merged = benchmark.merge_results(paths, base_seed=11, **grid)
+    assert _strip_time(merged) == _strip_time(serial)
+    out = str(tmp_path / f"merged{suffix}")
+    benchmark.write_results(out, merged)
+    assert benchmark.read_results(out) == merged
+
+
+def test_merge_rejects_incomplete_or_duplicate_shards(tmp_path) -> None:
+    path = str(tmp_path / "shard1.csv")
+    benchmark.write_results(path, benchmark.run_benchmarks(base_seed=11, shard=(1, 2), **GRID))
+    with pytest.raises(ValueError, match="Missing"):
+        benchmark.merge_results([path], base_seed=11, **GRID)
+    with pytest.raises(ValueError, match="duplicate"):
+        benchmark.merge_results([path, path], base_seed=11, **GRID)
+
+
+@pytest.mark.parametrize("suffix", [".csv", ".json", ".jsonl", ".cols"])
+def test_resume_after_interruption_runs_only_missing_cells(tmp_path, suffix: str) -> None:
+    path = str(tmp_path / f"out{suffix}")
+    grid = dict(GRID, algorithms=["external", *GRID["algorithms"]])
+    serial = benchmark.run_benchmarks(base_seed=5, **grid)
+
+    writer = benchmark.ResultWriter(path)
+    for row in serial[:7]:
+        writer.write(row)
+    torn = {
+        ".csv": "bubble,,10,ran",
+        ".json": ',\n{"algorithm": "bub',
+        ".jsonl": '{"algo',
+        ".cols": '{"algo',
+    }
+    writer._handle.write(torn[suffix])
+    writer._handle.flush()  # simulate a crash: no close, torn final row
+
+    with benchmark.ResultWriter(path, resume=True) as resumed:
+        assert len(resumed.completed) == 7
+        rows = list(
+            benchmark.iter_benchmarks(base_seed=5, skip=frozenset(resumed.completed), **grid)
+        )
+        for row in rows:
+            resumed.write(row)
+
+    assert len(rows) == len(serial) - 7
+    merged = benchmark.read_results(path)
+    assert sorted(map(benchmark.result_key, merged)) == sorted(map(benchmark.result_key, serial))
+    if suffix != ".csv":
+        # CSV writes missing columns as empty cells; the other formats leave them out.
+        by_key = {benchmark.result_key(row): row for row in merged}
+        restored = [by_key[benchmark.result_key(row)] for row in serial]
+        assert _strip_time(restored) == _strip_time(serial)
+
+
+def test_csv_writer_widens_header_for_new_columns(tmp_path) -> None:
+    path = str(tmp_path / "out.csv")
+    rows = benchmark.run_benchmarks(base_seed=1, **GRID)[:3]
+    with benchmark.ResultWriter(path) as writer:
+        writer.write(rows[0])
+        writer.write({**rows[1], "extra_metric": 2.5})
+        writer.write(rows[2])
+    loaded = benchmark.read_results(path)
+    assert [row["extra_metric"] for row in loaded] == ["", 2.5, ""]
+    loaded[0].pop("extra_metric")
+    assert _strip_time(loaded)[0] == _strip_time(rows)[0]
+
+
+def test_crash_during_header_rewrite_keeps_finished_rows(tmp_path, monkeypatch) -> None:
+    path = str(tmp_path / "out.csv")
+    rows = benchmark.run_benchmarks(base_seed=1, **GRID)[:4]
+    writer = benchmark.ResultWriter(path)
+    for row in rows[:3]:
+        writer.write(row)
+
+    def crash(row: dict[str, object]) -> None:
+        raise KeyboardInterrupt
+
+    monkeypatch.setattr(writer, "_append", crash)
+    with pytest.raises(KeyboardInterrupt):
+        writer.write({**rows[3], "extra_metric": 1})
+
+    loaded = benchmark.read_results(path)
+    assert _strip_time(loaded) == _strip_time(rows[:3])
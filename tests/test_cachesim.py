@@ -0,0 +1,110 @@
+from __future__ import annotations
+
+import pytest
+
+from benchmark import run_benchmarks
+from cachesim import STRIDE_BUCKETS, CacheConfig, CacheModel, CacheSink
+from datasets import generate
+from instrumentation import Event, Instrumentation
+from sorts import ALGORITHMS
+from trace_compression import TraceCompressor
+
+
+def _traced(algo: str, n: int, config: CacheConfig | None = None, compress: bool = False):
+    sink = CacheSink(config)
+    compressor = TraceCompressor(sink)
+    inst = Instrumentation(event_sink=compressor if compress else sink)
+    ALGORITHMS[algo](generate("random", n, 7), inst, gap_variant="knuth")
+    compressor.flush()
+    return inst, sink
+
+
+def test_config_rejects_bad_geometry() -> None:
+    with pytest.raises(ValueError):
+        CacheConfig(line_size=64, capacity=1000, ways=8)
+    with pytest.raises(ValueError):
+        CacheConfig(ways=0)
+    assert CacheConfig().sets == 64
+
+
+def test_model_hits_within_a_line_and_evicts_lru() -> None:
+    # Direct-mapped, two sets of one 8-element line each.
+    model = CacheModel(CacheConfig(line_size=64, capacity=128, ways=1))
+    assert not model.access(0)
+    assert model.access(7)
+    assert not model.access(8)
+    assert not model.access(16)  # same set as index 0, evicts it
+    assert not model.access(0)
+    assert (model.hits, model.misses) == (1, 4)
+
+
+def test_model_lru_keeps_recently_used_line() -> None:
+    model = CacheModel(CacheConfig(line_size=8, capacity=16, ways=2, element_size=8))
+    model.access(0)
+    model.access(1)
+    model.access(0)  # 1 is now least recently used
+    model.access(2)
+    assert model.access(0)
+    assert not model.access(1)
+
+
+def test_sink_counts_accesses_per_event_kind() -> None:
+    sink = CacheSink()
+    sink(Event("compare", (0, 1), comparisons=1))
+    sink(Event("swap", (0, 1), comparisons=1, swaps=1))
+    sink(Event("write", (5,), value=3, comparisons=1, swaps=1, writes=1))
+    sink(Event("mark", (2,), comparisons=1, swaps=1, writes=1))
+    stats = sink.stats()
+    assert stats["cache_accesses"] == 2 + 4 + 1
+    assert stats["cache_misses"] == 1
+    assert sum(stats[column] for _, _, column in STRIDE_BUCKETS) == 6
+
+
+def test_bubble_is_more_local_than_selection() -> None:
+    _, bubble = _traced("bubble", 300)
+    _, selection = _traced("selection", 300)
+    assert bubble.strides["stride_1"] > selection.strides["stride_1"]
+    assert bubble.stats()["stride_512p"] == 0
+
+
+def test_small_cache_misses_more() -> None:
+    _, large = _traced("shell", 2000)
+    _, small = _traced("shell", 2000, CacheConfig(line_size=64, capacity=512, ways=2))
+    assert small.model.misses > large.model.misses
+
+
+@pytest.mark.parametrize("algo", sorted(ALGORITHMS.keys()))
+def test_compressed_trace_gives_same_stats(algo: str) -> None:
+    _, plain = _traced(algo, 120)
+    _, compressed = _traced(algo, 120, compress=True)
+    assert compressed.stats() == plain.stats()
+
+
+def test_benchmark_rows_gain_cache_columns() -> None:
+    kwargs = dict(algorithms=["insertion"], sizes=[50], datasets=["random"], trials=1, base_seed=3)
+    plain = run_benchmarks(**kwargs)
+    modelled = run_benchmarks(cache=CacheConfig(), **kwargs)
+    assert "cache_misses" not in plain[0]
+    row = modelled[0]
+    for column in ("cache_accesses", "cache_misses", "cache_miss_rate", "stride_1"):
+        assert column in row
+    assert row["comparisons"] == plain[0]["comparisons"]
+    assert row["cache_accesses"] >= row["comparisons"] * 2
+
+
+def test_partly_traced_kernels_leave_cache_columns_empty() -> None:
+    rows = run_benchmarks(
+        algorithms=["external", "parallel", "shell"],
+        sizes=[50],
+        datasets=["random"],
+        trials=1,
+        base_seed=3,
+        gap_variants=["knuth"],
+        cache=CacheConfig(),
+        workers=2,
+    )
+    by_algo = {row["algorithm"]: row for row in rows}
+    assert "cache_accesses" not in by_algo["external"]
+    assert "cache_miss_rate" not in by_algo["external"]
+    assert "cache_accesses" not in by_algo["parallel"]
+    assert by_algo["shell"]["cache_accesses"] > 0
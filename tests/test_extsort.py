@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from benchmark import iter_cells, run_benchmarks
+from datasets import available_datasets, generate
+from extsort import ITEM_SIZE, external_sort, read_ints, write_ints
+from instrumentation import Instrumentation
+from sorts import ALGORITHMS
+
+
+def _sort_file(tmp_path: Path, values: list[int], **kwargs) -> tuple[list[int], dict, Instrumentation]:
+    src = tmp_path / "in.bin"
+    dst = tmp_path / "out.bin"
+    write_ints(str(src), values)
+    inst = Instrumentation()
+    stats = external_sort(str(src), str(dst), inst, tmp_dir=str(tmp_path), **kwargs)
+    return read_ints(str(dst)), stats, inst
+
+
+@pytest.mark.parametrize("dataset", available_datasets())
+def test_external_sort_matches_sorted(tmp_path: Path, dataset: str) -> None:
+    data = generate(dataset, 1000, 6)
+    result, stats, _ = _sort_file(tmp_path, data, chunk_items=64, fan_in=4, buffer_items=16)
+    assert result == sorted(data)
+    assert stats["runs"] == 16
+    # 16 runs -> 4 -> 1: run formation plus two merge passes.
+    assert stats["passes"] == 3
+    assert stats["io_bytes_read"] == stats["io_bytes_written"] == 3 * 1000 * ITEM_SIZE
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["in.bin", "out.bin"]
+
+
+def test_single_run_skips_merging(tmp_path: Path) -> None:
+    data = generate("random", 100, 1)
+    result, stats, inst = _sort_file(tmp_path, data, chunk_items=100)
+    assert result == sorted(data)
+    assert (stats["runs"], stats["passes"]) == (1, 1)
+    reference = Instrumentation()
+    ALGORITHMS["shell"](list(data), reference, gap_variant="tokuda")
+    assert inst.comparisons == reference.comparisons
+    assert inst.writes == reference.writes + len(data)
+
+
+def test_leftover_run_is_carried_without_io(tmp_path: Path) -> None:
+    data = generate("reversed", 500, 1)
+    result, stats, _ = _sort_file(tmp_path, data, chunk_items=100, fan_in=4)
+    assert result == sorted(data)
+    # 5 runs -> [4 merged, 1 renamed] -> 1; the renamed run is not re-read.
+    assert stats["passes"] == 3
+    assert stats["io_bytes_written"] == (500 + 400 + 500) * ITEM_SIZE
+
+
+def test_empty_and_invalid_inputs(tmp_path: Path) -> None:
+    result, stats, _ = _sort_file(tmp_path, [])
+    assert result == [] and stats["runs"] == 0
+    bad = tmp_path / "bad.bin"
+    bad.write_bytes(b"\x00" * (ITEM_SIZE + 3))
+    with pytest.raises(ValueError):
+        external_sort(str(bad), str(tmp_path / "out.bin"))
+    with pytest.raises(ValueError):
+        _sort_file(tmp_path, [1, 2], fan_in=1)
+
+
+def test_negative_and_large_values(tmp_path: Path) -> None:
+    data = [2**62, -(2**63), 0, -5, 2**63 - 1, 7] * 20
+    result, _, _ = _sort_file(tmp_path, data, chunk_items=7, fan_in=3, kernel="insertion")
+    assert result == sorted(data)
+
+
+def test_registered_wrapper_reports_io_columns() -> None:
+    rows = run_benchmarks(
+        algorithms=["external"], sizes=[3000], datasets=["random"], trials=1, base_seed=2
+    )
+    row = rows[0]
+    assert row["runs"] == 3
+    assert row["passes"] == 2
+    assert row["io_bytes_written"] == 2 * 3000 * ITEM_SIZE
+
+
+def test_unsupported_element_types_are_not_benchmarked() -> None:
+    cells = list(iter_cells(["external", "shell"], [10], ["random"], 1, ["knuth"], ["int", "str"]))
+    assert {(c[0], c[3]) for c in cells} == {("external", "int"), ("shell", "int"), ("shell", "str")}
@@ -0,0 +1,50 @@
+from __future__ import annotations
+
+import importlib.util
+import json
+from pathlib import Path
+
+import pytest
+
+_SCRIPT = Path(__file__).resolve().parents[1] / "scripts" / "microbench.py"
+_spec = importlib.util.spec_from_file_location("microbench", _SCRIPT)
+assert _spec is not None and _spec.loader is not None
+microbench = importlib.util.module_from_spec(_spec)
+_spec.loader.exec_module(microbench)
+
+
+def test_compare_results_flags_regressions(capsys: pytest.CaptureFixture[str]) -> None:
+    baseline = {
+        "instrumentation_ns_per_op": {"no_sink.compare": 100.0, "list_sink.write": 200.0},
+        "kernel_elements_per_sec": {"shell.knuth": 1000.0, "bubble": 500.0, "gone": 1.0},
+    }
+    current = {
+        "instrumentation_ns_per_op": {"no_sink.compare": 120.0, "list_sink.write": 150.0},
+        "kernel_elements_per_sec": {"shell.knuth": 850.0, "bubble": 480.0, "new": 2.0},
+    }
+    regressions = microbench.compare_results(baseline, current, threshold=0.10)
+    # Slower ns/op and lower throughput both count; a 4% drop is within tolerance.
+    assert regressions == [
+        "instrumentation_ns_per_op.no_sink.compare",
+        "kernel_elements_per_sec.shell.knuth",
+    ]
+    output = capsys.readouterr().out
+    assert "+20.0% !" in output
+    assert "-15.0% !" in output
+    assert "gone" in output and "new" in output
+
+
+def test_out_may_not_overwrite_the_baseline(tmp_path: Path) -> None:
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps({"meta": {}}), encoding="utf-8")
+    with pytest.raises(SystemExit):
+        microbench.main(["--out", str(baseline), "--compare", str(baseline)])
+    assert json.loads(baseline.read_text(encoding="utf-8")) == {"meta": {}}
+    assert microbench.DEFAULT_OUT != microbench.BASELINE
+
+
+def test_missing_baseline_fails_before_writing(tmp_path: Path) -> None:
+    out = tmp_path / "out.json"
+    with pytest.raises(FileNotFoundError):
+        microbench.main(["--out", str(out), "--compare", str(tmp_path / "missing.json")])
+    assert not out.exists()
@@ -0,0 +1,96 @@
+from __future__ import annotations
+
+import pytest
+
+from benchmark import estimate_cost, run_benchmarks
+from datasets import available_datasets, element_key, generate
+from instrumentation import Event, Instrumentation
+from sorts import ALGORITHMS, odd_even
+
+
+def _counters(inst: Instrumentation) -> tuple[int, int, int]:
+    return inst.comparisons, inst.swaps, inst.writes
+
+
+def test_python_backend_counts_phases() -> None:
+    inst = Instrumentation()
+    arr = [3, 2, 1]
+    odd_even.sort(arr, inst, backend="python")
+    assert arr == [1, 2, 3]
+    # Phases (0,1) | (1,2) | (0,1) | (1,2) clean | (0,1) clean.
+    assert _counters(inst) == (5, 3, 6)
+    assert inst.stats["backend"] == "python"
+
+
+def test_sorted_input_stops_after_two_clean_phases() -> None:
+    inst = Instrumentation()
+    odd_even.sort(list(range(10)), inst, backend="python")
+    assert _counters(inst) == (5 + 4, 0, 0)
+
+
+def test_auto_traces_per_element_when_sink_attached() -> None:
+    events: list[Event] = []
+    inst = Instrumentation(event_sink=events.append)
+    arr = generate("random", 40, 1)
+    ALGORITHMS["odd_even"](arr, inst)
+    assert arr == sorted(arr)
+    assert sum(event.kind == "compare" for event in events) == inst.comparisons
+
+
+def test_count_updates_counters_without_events() -> None:
+    events: list[Event] = []
+    inst = Instrumentation(event_sink=events.append)
+    inst.count(comparisons=4, swaps=1, writes=2)
+    assert _counters(inst) == (4, 1, 2)
+    assert events == []
+
+
+def test_unknown_backend() -> None:
+    with pytest.raises(ValueError):
+        odd_even.sort([2, 1], Instrumentation(), backend="gpu")
+
+
+@pytest.mark.skipif(odd_even._numpy() is not None, reason="numpy is installed")
+def test_numpy_backend_requires_numpy() -> None:
+    with pytest.raises(ValueError):
+        odd_even.sort([2, 1], Instrumentation(), backend="numpy")
+
+
+@pytest.mark.parametrize("element_type", ["int", "float"])
+@pytest.mark.parametrize("dataset", available_datasets())
+def test_numpy_backend_matches_python(dataset: str, element_type: str) -> None:
+    pytest.importorskip("numpy")
+    data = generate(dataset, 257, 9, element_type)
+    results = {}
+    for backend in ("python", "numpy"):
+        inst = Instrumentation()
+        arr = list(data)
+        odd_even.sort(arr, inst, backend=backend)
+        assert inst.stats["backend"] == backend
+        results[backend] = (arr, _counters(inst))
+    assert results["numpy"] == results["python"]
+    assert results["numpy"][0] == sorted(data)
+
+
+def test_numpy_backend_rejects_non_numeric() -> None:
+    pytest.importorskip("numpy")
+    with pytest.raises(ValueError):
+        odd_even.sort(["b", "a"], Instrumentation(), backend="numpy")
+    arr = generate("random", 30, 2, "record")
+    odd_even.sort(arr, Instrumentation(), key=element_key("record"))
+    assert [v for v, _ in arr] == sorted(v for v, _ in arr)
+
+
+def test_benchmark_warms_numpy_before_timing(monkeypatch: pytest.MonkeyPatch) -> None:
+    calls = []
+    monkeypatch.setattr(odd_even, "warm_up", lambda: calls.append("warm"))
+    run_benchmarks(["odd_even"], [20], ["random"], 2, 0)
+    assert calls == ["warm", "warm"]
+
+
+def test_cost_model_follows_the_backend(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(odd_even, "_numpy", lambda: None)
+    assert estimate_cost("odd_even", 1000) == estimate_cost("bubble", 1000)
+    monkeypatch.setattr(odd_even, "_numpy", lambda: object())
+    assert estimate_cost("odd_even", 1000) * 50 < estimate_cost("bubble", 1000)
+    assert estimate_cost("odd_even", 1000, "str") == estimate_cost("bubble", 1000, "str")
@@ -0,0 +1,173 @@
+from __future__ import annotations
+
+import threading
+
+import pytest
+
+from benchmark import run_benchmarks
+from datasets import element_key, generate
+from instrumentation import Event, Instrumentation
+from sorts import ALGORITHMS, parallel
+from sorts.merge import merge_runs
+from trace_compression import TraceReplay
+
+
+def _counters(inst: Instrumentation) -> tuple[int, int, int]:
+    return inst.comparisons, inst.swaps, inst.writes
+
+
+def test_merge_runs_is_stable_and_counted() -> None:
+    runs = [[(1, "a"), (3, "a")], [(1, "b"), (2, "b")], []]
+    out = [None] * 4
+    inst = Instrumentation()
+
+    class Key(tuple):
+        def __lt__(self, other):
+            return self[0] < other[0]
+
+        def __le__(self, other):
+            return self[0] <= other[0]
+
+    keyed = [[Key(item) for item in run] for run in runs]
+    merge_runs(keyed, out, inst)
+    assert out == [(1, "a"), (1, "b"), (2, "b"), (3, "a")]
+    assert inst.writes == 4
+    assert inst.comparisons > 0
+
+
+def test_bounds_cover_input() -> None:
+    assert parallel._bounds(10, 3) == [(0, 4), (4, 7), (7, 10)]
+
+
+@pytest.mark.parametrize("workers", [1, 2, 3])
+@pytest.mark.parametrize("n", [0, 1, 5, 200])
+def test_parallel_sorts(workers: int, n: int) -> None:
+    data = generate("random", n, 11)
+    inst = Instrumentation()
+    arr = list(data)
+    parallel.sort(arr, inst, workers=workers, kernel="shell", gap_variant="knuth")
+    assert arr == sorted(data)
+    assert inst.stats["workers"] == workers
+    assert inst.stats["chunks"] == min(workers, n)
+    assert inst.stats["cpu_ms"] >= 0
+
+
+def test_pool_and_in_process_counters_match() -> None:
+    data = generate("random", 300, 5)
+    pooled = Instrumentation()
+    parallel.sort(list(data), pooled, workers=2)
+    events: list[Event] = []
+    traced = Instrumentation(event_sink=events.append)
+    parallel.sort(list(data), traced, workers=2)
+    assert _counters(pooled) == _counters(traced)
+
+
+def test_traced_events_replay_to_sorted_array() -> None:
+    data = generate("random", 60, 8)
+    events: list[Event] = []
+    parallel.sort(list(data), Instrumentation(event_sink=events.append), workers=3)
+    replay = list(data)
+    for event in TraceReplay(events):
+        if event.kind == "swap":
+            i, j = event.indices
+            replay[i], replay[j] = replay[j], replay[i]
+        elif event.kind == "write":
+            replay[event.indices[0]] = event.value
+    assert replay == sorted(data)
+    assert events[-1].writes == sum(1 for e in events if e.kind == "write") + 2 * sum(
+        1 for e in events if e.kind == "swap"
+    )
+
+
+def test_small_chunks_use_small_kernel() -> None:
+    data = generate("reversed", 40, 1)
+    inst = Instrumentation()
+    parallel.sort(list(data), inst, workers=2, small_threshold=20)
+    reference = Instrumentation()
+    for start in (0, 20):
+        ALGORITHMS["insertion"](data[start : start + 20], reference)
+    assert inst.comparisons > reference.comparisons
+    assert inst.writes == reference.writes + len(data)
+
+
+def test_start_pool_warms_every_worker() -> None:
+    parallel.shutdown_pool()
+    parallel.start_pool(2)
+    assert parallel._pool is not None
+    pool = parallel._pool[1]
+    assert len(pool._processes) == 2
+    parallel.sort(list(range(50, 0, -1)), Instrumentation(), workers=2)
+    assert parallel._pool[1] is pool
+    parallel.start_pool(1)
+    assert parallel._pool[1] is pool
+
+
+def test_concurrent_sorts_share_the_pool_safely() -> None:
+    data = generate("random", 400, 4)
+    results: list[list[int]] = []
+    errors: list[BaseException] = []
+
+    def run(workers: int) -> None:
+        try:
+            for _ in range(3):
+                arr = list(data)
+                parallel.sort(arr, Instrumentation(), workers=workers)
+                results.append(arr)
+        except BaseException as exc:  # reported by the assert below
+            errors.append(exc)
+
+    threads = [threading.Thread(target=run, args=(workers,)) for workers in (2, 3, 2, 3)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert len(results) == 12 and all(arr == sorted(data) for arr in results)
+
+
+def test_keyed_records() -> None:
+    arr = generate("few_unique", 120, 3, "record")
+    parallel.sort(arr, Instrumentation(), workers=2, key=element_key("record"))
+    assert [value for value, _ in arr] == sorted(value for value, _ in arr)
+
+
+def test_benchmark_rows_gain_parallel_columns() -> None:
+    rows = run_benchmarks(
+        algorithms=["parallel"],
+        sizes=[100],
+        datasets=["random"],
+        trials=1,
+        base_seed=0,
+        gap_variants=["knuth", "tokuda"],
+        workers=2,
+    )
+    assert [row["gap_variant"] for row in rows] == ["knuth", "tokuda"]
+    for row in rows:
+        assert row["workers"] == 2
+        assert row["chunks"] == 2
+        for column in ("wall_ms", "cpu_ms", "merge_ms"):
+            assert column in row
+
+
+def test_benchmark_kernel_options() -> None:
+    options = {"small_kernel": "selection", "small_threshold": 60}
+    rows = run_benchmarks(
+        algorithms=["parallel"],
+        sizes=[100],
+        datasets=["reversed"],
+        trials=1,
+        base_seed=0,
+        gap_variants=["knuth", "tokuda"],
+        workers=2,
+        kernel="insertion",
+        kernel_options=options,
+    )
+    # Gaps don't matter to an insertion chunk kernel, so there is one row.
+    assert len(rows) == 1
+    row = rows[0]
+    assert row["gap_variant"] == "" and row["kernel"] == "insertion"
+    assert {name: row[name] for name in options} == options
+    reference = Instrumentation()
+    for start in (0, 50):
+        ALGORITHMS["selection"](generate("reversed", 100, row["seed"])[start : start + 50], reference)
+    assert row["swaps"] == reference.swaps
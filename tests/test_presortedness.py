@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import pytest
+
+from benchmark import run_benchmarks
+from datasets import available_datasets, element_key, generate
+from instrumentation import Instrumentation
+from presortedness import measure
+from sorts import ALGORITHMS, auto
+from sorts.keys import Keyed
+
+
+def test_exact_on_small_inputs() -> None:
+    probe = measure([1, 3, 2, 2, 0])
+    assert probe.runs == 3
+    assert probe.inversions == 6
+    assert probe.inversion_ratio == 0.6
+    assert probe.distinct_ratio == 0.8
+
+
+def test_trivial_inputs() -> None:
+    assert measure([]).runs == 0
+    assert measure([7]).inversions == 0
+
+
+def test_sampled_estimates_separate_datasets() -> None:
+    n = 5000
+    ratios = {d: measure(generate(d, n, 1)).inversion_ratio for d in available_datasets()}
+    assert ratios["sorted"] == 0.0
+    assert ratios["reversed"] == 1.0
+    assert ratios["nearly_sorted"] < 0.15
+    assert 0.35 < ratios["random"] < 0.65
+    assert measure(generate("sorted", n, 1)).runs == 1
+    assert measure(generate("reversed", n, 1)).runs > n * 0.9
+
+
+def test_measure_is_deterministic_and_accepts_unhashable_items() -> None:
+    data = generate("random", 2000, 4)
+    assert measure(data) == measure(list(data))
+    keyed = [Keyed(v, None) for v in data]
+    assert measure(keyed) == measure(data)
+    records = generate("random", 2000, 4, "record")
+    assert measure(records, key=element_key("record")) == measure(data)
+
+
+@pytest.mark.parametrize(
+    "dataset, expected",
+    [("sorted", "insertion"), ("random", "shell.tokuda"), ("reversed", "shell.tokuda")],
+)
+def test_auto_dispatch(dataset: str, expected: str) -> None:
+    data = generate(dataset, 1000, 2)
+    inst = Instrumentation()
+    arr = list(data)
+    ALGORITHMS["auto"](arr, inst)
+    assert arr == sorted(data)
+    assert inst.stats["auto_choice"] == expected
+    assert inst.stats["dispatch_ms"] >= 0
+
+
+def test_auto_counts_like_the_chosen_kernel() -> None:
+    data = generate("nearly_sorted", 100, 3)
+    algo, kwargs = auto.choose(measure(data, samples=100))
+    direct = Instrumentation()
+    ALGORITHMS[algo](list(data), direct, **kwargs)
+    dispatched = Instrumentation()
+    ALGORITHMS["auto"](list(data), dispatched)
+    assert (dispatched.comparisons, dispatched.writes) == (direct.comparisons, direct.writes)
+
+
+def test_small_inputs_skip_the_probe() -> None:
+    inst = Instrumentation()
+    ALGORITHMS["auto"](generate("reversed", auto.SMALL_INPUT, 1), inst)
+    assert inst.stats["auto_choice"] == "insertion"
+
+
+def test_benchmark_probe_columns() -> None:
+    rows = run_benchmarks(
+        algorithms=["auto"], sizes=[200], datasets=["sorted"], trials=1, base_seed=0, probe=True
+    )
+    row = rows[0]
+    assert row["presort_runs"] == 1
+    assert row["presort_inversions"] == 0
+    assert row["auto_choice"] == "insertion"
+    assert "presort_distinct_ratio" in row
@@ -0,0 +1,121 @@
+from __future__ import annotations
+
+import math
+import os
+from statistics import mean, median
+
+import pytest
+
+import benchmark
+from results_store import ResultTable, aggregate, load_table, save_table
+
+GRID = {
+    "algorithms": ["insertion", "shell"],
+    "sizes": [10, 30],
+    "datasets": ["random", "sorted"],
+    "trials": 3,
+    "gap_variants": ["knuth"],
+}
+
+
+@pytest.fixture
+def rows() -> list[dict[str, object]]:
+    return benchmark.run_benchmarks(base_seed=2, **GRID)
+
+
+def test_table_round_trips_through_columnar_file(tmp_path, rows) -> None:
+    path = str(tmp_path / "results.cols")
+    save_table(ResultTable.from_rows(rows), path)
+    table = load_table(path)
+    assert table.to_rows() == rows
+    assert table.columns["n"].kind == "q"
+    assert table.columns["time_ms"].kind == "d"
+    assert table.columns["algorithm"].kind == "str"
+
+
+def test_sparse_columns_round_trip(tmp_path) -> None:
+    rows = [
+        {"algorithm": "external", "gap_variant": "", "n": 10, "runs": 2, "rate": 0.5},
+        {"algorithm": "shell", "gap_variant": "knuth", "n": 10, "label": "x"},
+        {"algorithm": "parallel", "gap_variant": "knuth", "n": 20, "runs": 3, "rate": ""},
+    ]
+    path = str(tmp_path / "sparse.cols")
+    save_table(ResultTable.from_rows(rows), path)
+    table = load_table(path)
+    assert table.columns["runs"].kind == "q"
+    assert table.to_rows() == [
+        rows[0],
+        rows[1],
+        {"algorithm": "parallel", "gap_variant": "knuth", "n": 20, "runs": 3},
+    ]
+    assert table.unique("runs") == [2, 3]
+    assert table.group_by(("runs",), "n", "count") == {(2,): 1.0, (3,): 1.0}
+    assert table.filter(("label",), lambda label: label is None).column("n") == [10, 20]
+
+
+def test_group_by_matches_row_wise_aggregation(rows) -> None:
+    table = ResultTable.from_rows(rows).where(dataset="random")
+    for how, reduce in (("mean", mean), ("median", median), ("max", max)):
+        grouped = table.group_by(("algorithm", "n"), "comparisons", how)
+        for (algo, n), value in grouped.items():
+            expected = [
+                r["comparisons"]
+                for r in rows
+                if r["algorithm"] == algo and r["n"] == n and r["dataset"] == "random"
+            ]
+            assert value == pytest.approx(reduce(expected))
+
+
+def test_filter_and_missing_values() -> None:
+    table = ResultTable.from_rows(
+        [
+            {"algorithm": "shell", "gap_variant": "knuth", "n": 1, "extra": 1.0},
+            {"algorithm": "shell", "gap_variant": "shell", "n": 1, "extra": ""},
+            {"algorithm": "bubble", "gap_variant": "", "n": 2, "extra": 3.0},
+        ]
+    )
+    kept = table.filter(("algorithm", "gap_variant"), lambda a, g: a != "shell" or g == "shell")
+    assert kept.column("n") == [1, 2]
+    assert table.group_by(("algorithm",), "extra", "count") == {("bubble",): 1.0, ("shell",): 1.0}
+    assert len(table.where(missing="x")) == 0
+
+
+def test_percentiles() -> None:
+    assert aggregate([1, 2, 3, 4, 5], "p50") == 3
+    assert aggregate([1, 2, 3, 4], "p90") == pytest.approx(3.7)
+    assert math.isnan(aggregate([], "p50"))
+    with pytest.raises(ValueError):
+        aggregate([1], "bogus")
+
+
+def test_result_writer_produces_columnar_output(tmp_path, rows) -> None:
+    path = str(tmp_path / "out.cols")
+    benchmark.write_results(path, rows)
+    assert not os.path.exists(path + ".partial.jsonl")
+    assert benchmark.read_results(path) == rows
+
+    with benchmark.ResultWriter(path, resume=True) as writer:
+        assert len(writer.completed) == len(rows)
+    assert benchmark.read_results(path) == rows
+
+
+def test_csv_tables_are_cached_until_source_changes(tmp_path, rows) -> None:
+    path = str(tmp_path / "out.csv")
+    benchmark.write_results(path, rows[:4])
+    assert len(benchmark.load_results_table(path)) == 4
+    assert os.path.exists(path + ".cols")
+
+    benchmark.write_results(path, rows)
+    assert len(benchmark.load_results_table(path)) == len(rows)
+
+
+def test_stale_cache_is_rebuilt_even_if_newer(tmp_path, rows) -> None:
+    path = str(tmp_path / "out.csv")
+    benchmark.write_results(path, rows[:4])
+    benchmark.load_results_table(path)
+    benchmark.write_results(path, rows)
+    # A cache stamped later than the source used to be trusted.
+    stamp = os.path.getmtime(path) + 10
+    os.utime(path + ".cols", (stamp, stamp))
+    assert len(benchmark.load_results_table(path)) == len(rows)
+    assert len(load_table(path + ".cols")) == len(rows)
@@ -0,0 +1,130 @@
+from __future__ import annotations
+
+import pytest
+
+from datasets import generate
+from instrumentation import (
+    EveryKth,
+    Event,
+    Instrumentation,
+    KindFilter,
+    RateLimit,
+    ReservoirSampler,
+    keep_state,
+    parse_sampler,
+)
+from sorts import ALGORITHMS
+from trace_compression import expand, record_trace
+
+
+def _run(algo: str, sampler=None, sink=None) -> tuple[Instrumentation, list[Event]]:
+    events: list[Event] = []
+    inst = Instrumentation(event_sink=sink or events.append, sampler=sampler)
+    ALGORITHMS[algo](generate("random", 80, 4), inst, gap_variant="knuth")
+    return inst, events
+
+
+def _counters(inst: Instrumentation) -> tuple[int, int, int]:
+    return inst.comparisons, inst.swaps, inst.writes
+
+
+@pytest.mark.parametrize("algo", sorted(ALGORITHMS.keys()))
+def test_sampled_counters_stay_exact(algo: str) -> None:
+    full, events = _run(algo)
+    for sampler in (EveryKth(7), KindFilter({"swap", "write"}), RateLimit(3, 50)):
+        inst, sampled = _run(algo, sampler)
+        assert _counters(inst) == _counters(full)
+        assert len(sampled) < len(events) or not events
+        assert set(sampled) <= set(events)
+
+
+def test_every_kth_keeps_strided_events() -> None:
+    _, events = _run("insertion")
+    _, sampled = _run("insertion", EveryKth(5))
+    assert sampled == events[::5]
+
+
+def test_kind_filter_keeps_all_writes() -> None:
+    _, events = _run("shell")
+    _, sampled = _run("shell", KindFilter({"swap", "write"}))
+    assert sampled == [event for event in events if event.kind in ("swap", "write")]
+
+
+def test_rate_limit_caps_each_window() -> None:
+    _, events = _run("bubble")
+    _, sampled = _run("bubble", RateLimit(2, 100))
+    expected = [event for pos, event in enumerate(events) if pos % 100 < 2]
+    assert sampled == expected
+
+
+def test_reservoir_is_bounded_ordered_and_deterministic() -> None:
+    _, events = _run("bubble")
+    first = ReservoirSampler(40, seed=3)
+    _run("bubble", first, sink=first)
+    second = ReservoirSampler(40, seed=3)
+    _run("bubble", second, sink=second)
+
+    assert len(first.events) == 40
+    assert first.events == second.events
+    position = {event: pos for pos, event in enumerate(events)}
+    positions = [position[event] for event in first.events]
+    assert positions == sorted(positions)
+
+
+@pytest.mark.parametrize(
+    "spec, kind",
+    [
+        ("every:3", EveryKth),
+        ("kinds:swap,write", KindFilter),
+        ("window:10/100", RateLimit),
+        ("reservoir:20:5", ReservoirSampler),
+    ],
+)
+def test_parse_sampler(spec: str, kind: type) -> None:
+    assert isinstance(parse_sampler(spec), kind)
+
+
+@pytest.mark.parametrize("spec", ["every:0", "window:5", "bogus:1", "reservoir:x"])
+def test_parse_sampler_rejects_bad_specs(spec: str) -> None:
+    with pytest.raises(ValueError):
+        parse_sampler(spec)
+
+
+@pytest.mark.parametrize("spec", ["every:7", "window:5/50", "reservoir:100:1"])
+@pytest.mark.parametrize("algo", ["bubble", "insertion", "shell"])
+def test_sampled_trace_replays_to_sorted(algo: str, spec: str) -> None:
+    data = generate("random", 50, 2)
+    events: list[Event] = []
+    record_trace(ALGORITHMS[algo], list(data), events.append, sampler=parse_sampler(spec))
+    full: list[Event] = []
+    record_trace(ALGORITHMS[algo], list(data), full.append, compress_runs=False)
+
+    replay = list(data)
+    for event in expand(events):
+        if event.kind == "swap":
+            i, j = event.indices
+            replay[i], replay[j] = replay[j], replay[i]
+        elif event.kind == "write":
+            replay[event.indices[0]] = event.value
+    assert replay == sorted(data)
+    assert len(list(expand(events))) < len(full)
+
+
+def test_keep_state_reservoir_samples_only_other_kinds() -> None:
+    reservoir = keep_state(ReservoirSampler(10, seed=2))
+    inst, _ = _run("bubble", reservoir, sink=reservoir)
+    kept = reservoir.events
+    assert sum(event.kind == "compare" for event in kept) == 10
+    assert sum(event.kind == "swap" for event in kept) == inst.swaps
+    order = [(e.comparisons, e.swaps, e.writes) for e in kept]
+    assert order == sorted(order)
+
+
+def test_record_trace_leaves_the_callers_reservoir_alone() -> None:
+    reservoir = ReservoirSampler(10, seed=2)
+    data = generate("random", 80, 4)
+    record_trace(ALGORITHMS["bubble"], list(data), lambda event: None, sampler=reservoir)
+    assert reservoir.keep_kinds == frozenset()
+    assert reservoir.events == []
+    _run("bubble", reservoir, sink=reservoir)
+    assert len(reservoir.events) == 10
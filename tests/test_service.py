@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+from dataclasses import asdict
+
+import pytest
+
+import benchmark
+from datasets import generate
+from instrumentation import Event
+from service import BenchmarkHTTPServer, BenchmarkService, Job, RowsReleased
+from sorts import ALGORITHMS
+from trace_compression import record_trace
+
+
+@pytest.fixture
+def server():
+    service = BenchmarkService(workers=1)
+    service.start()
+    httpd = BenchmarkHTTPServer(("127.0.0.1", 0), service)
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}", service
+    httpd.shutdown()
+    httpd.server_close()
+    service.stop()
+
+
+def _post(url: str, payload: dict) -> dict:
+    request = urllib.request.Request(
+        url,
+        data=json.dumps(payload).encode("utf-8"),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with urllib.request.urlopen(request) as response:
+        return json.loads(response.read())
+
+
+def _stream(url: str) -> list[dict]:
+    with urllib.request.urlopen(url) as response:
+        return [json.loads(line) for line in response if line.strip()]
+
+
+def test_bench_job_matches_cli_rows(server) -> None:
+    base, _ = server
+    params = {"algorithms": ["insertion"], "sizes": [20], "datasets": ["random"], "trials": 2, "seed": 7}
+    job = _post(f"{base}/jobs", {"kind": "bench", "params": params})
+    lines = _stream(f"{base}/jobs/{job['id']}/rows")
+
+    rows, trailer = lines[:-1], lines[-1]
+    assert trailer["status"] == "done"
+    expected = benchmark.run_benchmarks(["insertion"], [20], ["random"], 2, 7)
+    strip = lambda row: {k: v for k, v in row.items() if k != "time_ms"}
+    assert [strip(r) for r in rows] == [strip(r) for r in expected]
+
+
+def test_trace_job_streams_events_and_reuses_cache(server) -> None:
+    base, service = server
+    params = {"algo": "bubble", "n": 10, "seed": 3}
+    first = _post(f"{base}/jobs", {"kind": "trace", "params": params})
+    lines = _stream(f"{base}/jobs/{first['id']}/rows")
+    assert lines[0]["kind"] == "initial"
+    assert all("comparisons" in event for event in lines[1:-1])
+
+    second = _post(f"{base}/jobs", {"kind": "trace", "params": params})
+    _stream(f"{base}/jobs/{second['id']}/rows")
+    assert service.cache.hits >= 1
+
+
+def test_invalid_job_is_rejected(server) -> None:
+    base, _ = server
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _post(f"{base}/jobs", {"kind": "bench", "params": {"algorithms": ["nope"]}})
+    assert excinfo.value.code == 400
+
+
+def test_streamed_rows_are_released(server) -> None:
+    base, service = server
+    job = _post(f"{base}/jobs", {"kind": "trace", "params": {"algo": "insertion", "n": 15}})
+    lines = _stream(f"{base}/jobs/{job['id']}/rows")
+    assert lines[-1]["rows"] == len(lines) - 1
+    kept = service.get(job["id"])
+    assert kept.rows == [] and kept.snapshot()["rows"] == len(lines) - 1
+
+
+def test_attached_reader_applies_backpressure() -> None:
+    job = Job(id=1, kind="trace", params={}, max_rows=8, keep_first=1)
+    buffered = []
+
+    def produce() -> None:
+        for index in range(1, 100):
+            job.append({"i": index})
+            buffered.append(len(job.rows))
+        job.finish()
+
+    job.append({"i": 0})
+    rows = job.iter_rows()
+    first = next(rows)
+    producer = threading.Thread(target=produce)
+    producer.start()
+    received = [first, *rows]
+    producer.join()
+    assert [row["i"] for row in received] == list(range(100))
+    assert max(buffered) <= 8
+    assert job.rows[0] == {"i": 0}
+    with pytest.raises(RowsReleased):
+        job.iter_rows()
+
+
+def test_trace_over_row_limit_fails_instead_of_truncating() -> None:
+    service = BenchmarkService(workers=1, max_job_rows=50)
+    service.start()
+    job = service.submit("trace", {"algo": "bubble", "n": 600})
+    while not job.done:
+        time.sleep(0.01)
+    service.stop()
+    assert job.status == "failed" and "RowLimitExceeded" in (job.error or "")
+    rows = list(job.iter_rows())
+    assert len(rows) == 50
+    assert rows[0]["kind"] == "initial"
+    events: list[Event] = []
+    record_trace(ALGORITHMS["bubble"], generate("random", 600, 0), events.append, compress_runs=False)
+    assert rows[1:] == [asdict(event) for event in events[:49]]
+
+
+def test_fetching_an_oversized_finished_trace(server) -> None:
+    base, service = server
+    service.max_job_rows = 50
+    job = _post(f"{base}/jobs", {"kind": "trace", "params": {"algo": "bubble", "n": 600}})
+    while not service.get(job["id"]).done:
+        time.sleep(0.01)
+    lines = _stream(f"{base}/jobs/{job['id']}/rows")
+    assert lines[0]["kind"] == "initial"
+    assert len(lines) == 51
+    assert lines[-1]["status"] == "failed" and lines[-1]["rows"] == 50
+    with pytest.raises(urllib.error.HTTPError) as excinfo:
+        _stream(f"{base}/jobs/{job['id']}/rows")
+    assert excinfo.value.code == 410
+
+
+def test_finished_jobs_are_evicted() -> None:
+    service = BenchmarkService(workers=1, max_finished_jobs=2)
+    service.start()
+    params = {"algo": "insertion", "n": 5}
+    jobs = [service.submit("trace", params) for _ in range(4)]
+    list(jobs[-1].iter_rows())
+    service.stop()
+    assert [job.id for job in service.jobs()] == [jobs[2].id, jobs[3].id]
+
+
+def test_stop_cancels_running_and_queued_jobs() -> None:
+    service = BenchmarkService(workers=1, max_job_rows=None)
+    service.start()
+    slow = {"algo": "bubble", "n": 3000, "compress": False}
+    running = service.submit("trace", slow)
+    queued = [service.submit("trace", slow) for _ in range(3)]
+    while running.status == "queued":
+        time.sleep(0.01)
+    start = time.perf_counter()
+    service.stop()
+    assert time.perf_counter() - start < 5
+    for job in [running, *queued]:
+        assert job.status == "failed" and "cancelled" in (job.error or "")
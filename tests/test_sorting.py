@@ -2,9 +2,9 @@ from __future__ import annotations
 
 import pytest
 
-from datasets import available_datasets, generate
+from datasets import available_datasets, available_element_types, element_key, generate
 from instrumentation import Instrumentation
-from sorts import ALGORITHMS
+from sorts import ALGORITHMS, supports
 from sorts.gaps import available_variants
 
 
@@ -57,3 +57,38 @@ def test_trace_matches_benchmark(algo: str) -> None:
     ALGORITHMS[algo](traced, inst_trace, gap_variant="shell")
 
     assert base == traced
+
+
+@pytest.mark.parametrize("element_type", available_element_types())
+@pytest.mark.parametrize("algo", sorted(ALGORITHMS.keys()))
+def test_sort_element_types(algo: str, element_type: str) -> None:
+    data = generate("few_unique", 40, 5, element_type)
+    key = element_key(element_type)
+    arr = list(data)
+    if not supports(algo, element_type):
+        with pytest.raises(ValueError):
+            ALGORITHMS[algo](arr, Instrumentation(), key=key)
+        return
+    ALGORITHMS[algo](arr, Instrumentation(), gap_variant="knuth", key=key)
+    if key is None:
+        assert arr == sorted(data)
+    else:
+        assert [key(x) for x in arr] == sorted(key(x) for x in data)
+        assert sorted(arr) == sorted(data)
+
+
+@pytest.mark.parametrize("algo", ["bubble", "insertion"])
+def test_key_sort_is_stable(algo: str) -> None:
+    records = [(3, "a"), (1, "b"), (3, "c"), (2, "d"), (1, "e")]
+    arr = list(records)
+    ALGORITHMS[algo](arr, Instrumentation(), key=lambda record: record[0])
+    assert arr == sorted(records, key=lambda record: record[0])
+
+
+def test_element_types_preserve_dataset_order() -> None:
+    ints = generate("nearly_sorted", 60, 8)
+    for element_type in available_element_types():
+        converted = generate("nearly_sorted", 60, 8, element_type)
+        key = element_key(element_type) or (lambda x: x)
+        ranks = sorted(range(60), key=lambda i: (key(converted[i]), i))
+        assert ranks == sorted(range(60), key=lambda i: (ints[i], i))
@@ -0,0 +1,71 @@
+from __future__ import annotations
+
+import pytest
+
+from datasets import available_datasets, generate
+from instrumentation import Event, Instrumentation
+from sorts import ALGORITHMS
+from sorts.gaps import available_variants
+from trace_compression import TraceCompressor, TraceReplay, compress, expand, expanded_length
+
+
+def _trace(algo: str, dataset: str, n: int = 60, gap_variant: str = "shell") -> list[Event]:
+    events: list[Event] = []
+    data = generate(dataset, n, 17)
+    ALGORITHMS[algo](data, Instrumentation(event_sink=events.append), gap_variant=gap_variant)
+    return events
+
+
+@pytest.mark.parametrize("dataset", available_datasets())
+@pytest.mark.parametrize("algo", sorted(ALGORITHMS.keys()))
+def test_compressed_trace_expands_to_original(algo: str, dataset: str) -> None:
+    variants = available_variants() if algo == "shell" else ["shell"]
+    for variant in variants:
+        events = _trace(algo, dataset, gap_variant=variant)
+        for min_run in (1, 2, 5):
+            compressed = compress(events, min_run=min_run)
+            assert list(expand(compressed)) == events
+            assert expanded_length(compressed) == len(events)
+
+
+def test_streaming_compressor_matches_batch() -> None:
+    out: list[Event] = []
+    compressor = TraceCompressor(out.append)
+    data = generate("reversed", 40, 17)
+    ALGORITHMS["insertion"](data, Instrumentation(event_sink=compressor))
+    compressor.flush()
+    assert out == compress(_trace("insertion", "reversed", n=40))
+    assert data == sorted(data)
+
+
+def test_insertion_reversed_trace_shrinks() -> None:
+    events = _trace("insertion", "reversed", n=200)
+    compressed = compress(events)
+    assert {event.kind for event in compressed} == {"insert_run"}
+    assert len(compressed) * 20 < len(events)
+
+
+@pytest.mark.parametrize("variant", ["shell", "knuth", "tokuda"])
+def test_shell_reversed_trace_shrinks(variant: str) -> None:
+    events = _trace("shell", "reversed", n=1000, gap_variant=variant)
+    compressed = compress(events)
+    assert "insert_run" in {event.kind for event in compressed}
+    assert len(compressed) * 100 < len(events)
+
+
+def test_insert_runs_are_capped_for_streaming() -> None:
+    events = _trace("insertion", "reversed", n=100)
+    compressed = compress(events)
+    assert [event.indices[2] for event in compressed] == [64, 35]
+    assert list(expand(compressed)) == events
+
+
+def test_replay_indexes_frames_lazily() -> None:
+    events = _trace("shell", "reversed", gap_variant="knuth")
+    replay = TraceReplay(compress(events))
+    assert len(replay) == len(events)
+    assert [replay[i] for i in range(len(replay))] == events
+    assert replay[0] == events[0]
+    with pytest.raises(IndexError):
+        replay[len(events)]
+
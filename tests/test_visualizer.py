@@ -0,0 +1,42 @@
+from __future__ import annotations
+
+import pytest
+
+from datasets import generate
+from instrumentation import Event, Instrumentation
+from sorts import ALGORITHMS
+from visualizer import EventStream
+
+
+def _trace(algo: str, dataset: str, n: int = 60) -> list[Event]:
+    events: list[Event] = []
+    ALGORITHMS[algo](generate(dataset, n, 17), Instrumentation(event_sink=events.append))
+    return events
+
+
+def test_event_stream_delivers_full_trace_with_bounded_queue() -> None:
+    data = generate("reversed", 60, 17)
+
+    def produce(sink) -> None:
+        ALGORITHMS["insertion"](data, Instrumentation(event_sink=sink))
+
+    stream = EventStream(produce, maxsize=4).start()
+    assert list(stream) == _trace("insertion", "reversed")
+
+
+def test_event_stream_reraises_producer_errors() -> None:
+    def produce(sink) -> None:
+        raise RuntimeError("boom")
+
+    with pytest.raises(RuntimeError, match="boom"):
+        list(EventStream(produce).start())
+
+
+def test_event_stream_close_stops_blocked_producer() -> None:
+    def produce(sink) -> None:
+        ALGORITHMS["bubble"](generate("reversed", 200, 1), Instrumentation(event_sink=sink))
+
+    stream = EventStream(produce, maxsize=2).start()
+    next(iter(stream))
+    stream.close()
+    assert not stream._thread.is_alive()
@@ -0,0 +1,380 @@
+from __future__ import annotations
+
+from typing import Any, Callable, Iterable, Iterator, List, Optional
+
+from instrumentation import Event, Instrumentation, ReservoirSampler, Sampler, keep_state
+
+# Compact run encodings (counters on a run event are those of its first event):
+#   compare_run: indices=(i0, j0, di, dj, count)
+#       count compares at (i0 + k*di, j0 + k*dj), each adding one comparison.
+#   insert_run:  indices=(start, step, count), value=(values_0, values_1, ...)
+#       count gapped-insertion steps at i = start, start + 1, ... For step i
+#       with values (v0, ..., vk) and p = i - t*step: k pairs compare(p - step, p)
+#       then write(p, v_t), followed by the closing compare(p - step, p) (only
+#       while p >= step) and write(p, vk). This is insertion (step 1) and one
+#       shell pass (step = gap), including the compare that stops each shift
+#       and the write of the held element.
+
+
+def _insert_step(i: int, step: int, values: tuple) -> Iterator[tuple]:
+    """Yield (kind, indices, value) for one encoded gapped-insertion step."""
+    pos = i
+    last = len(values) - 1
+    for t, value in enumerate(values):
+        if t < last or pos >= step:
+            yield "compare", (pos - step, pos), None
+        yield "write", (pos,), value
+        pos -= step
+
+
+def expand_event(event: Event) -> Iterator[Event]:
+    """Yield the raw events encoded by ``event`` (or ``event`` itself)."""
+    if event.kind == "compare_run":
+        i0, j0, di, dj, count = event.indices
+        for k in range(count):
+            yield Event(
+                kind="compare",
+                indices=(i0 + k * di, j0 + k * dj),
+                comparisons=event.comparisons + k,
+                swaps=event.swaps,
+                writes=event.writes,
+            )
+    elif event.kind == "insert_run":
+        start, step, _ = event.indices
+        comparisons = event.comparisons - 1
+        writes = event.writes
+        for k, values in enumerate(event.value or ()):
+            for kind, indices, value in _insert_step(start + k, step, values):
+                if kind == "compare":
+                    comparisons += 1
+                else:
+                    writes += 1
+                yield Event(
+                    kind=kind,
+                    indices=indices,
+                    value=value,
+                    comparisons=comparisons,
+                    swaps=event.swaps,
+                    writes=writes,
+                )
+    else:
+        yield event
+
+
+def expand(events: Iterable[Event]) -> Iterator[Event]:
+    """Lazily expand a (possibly compressed) trace into raw events."""
+    for event in events:
+        yield from expand_event(event)
+
+
+def expanded_length(events: Iterable[Event]) -> int:
+    total = 0
+    for event in events:
+        if event.kind == "compare_run":
+            total += event.indices[4]
+        elif event.kind == "insert_run":
+            start, step, _ = event.indices
+            for k, values in enumerate(event.value or ()):
+                shifts = len(values) - 1
+                total += 2 * shifts + 1 + (start + k - shifts * step >= step)
+        else:
+            total += 1
+    return total
+
+
+class TraceReplay:
+    """Frame-indexed view of a compressed trace that expands runs on demand.
+
+    Animations ask for frames in increasing order (occasionally repeating
+    one), so only the current raw event is materialised. Asking for an
+    earlier frame restarts the expansion.
+    """
+
+    def __init__(self, events: Iterable[Event]) -> None:
+        self._events = list(events)
+        self._length = expanded_length(self._events)
+        self._reset()
+
+    def _reset(self) -> None:
+        self._stream = expand(self._events)
+        self._index = -1
+        self._current: Optional[Event] = None
+
+    def __len__(self) -> int:
+        return self._length
+
+    def __getitem__(self, frame: int) -> Event:
+        if not 0 <= frame < self._length:
+            raise IndexError(frame)
+        if frame < self._index:
+            self._reset()
+        while self._index < frame:
+            self._current = next(self._stream)
+            self._index += 1
+        assert self._current is not None
+        return self._current
+
+
+class TraceCompressor:
+    """Event sink that coalesces compare runs and insertion steps before forwarding.
+
+    Wrap the real consumer: ``Instrumentation(event_sink=TraceCompressor(events.append))``
+    and call :meth:`flush` once the sort returns. Runs shorter than ``min_run``
+    are forwarded as raw events, so ``expand`` of the output always equals
+    the uncompressed trace. An ``insert_run`` is forwarded after at most
+    ``max_steps`` steps, which keeps streamed traces moving.
+    """
+
+    def __init__(
+        self, sink: Callable[[Event], None], min_run: int = 2, max_steps: int = 64
+    ) -> None:
+        self._sink = sink
+        self._min_run = max(1, min_run)
+        self._max_steps = max(1, max_steps)
+        self._mode: Optional[str] = None
+        self._first: Optional[Event] = None
+        self._last: Optional[Event] = None
+        self._count = 0
+        self._delta: Optional[tuple[int, int]] = None
+        self._start = 0
+        self._step = 0
+        self._steps: List[tuple] = []
+        self._values: List[object] = []
+        self._phase = ""
+        self._partial: List[Event] = []
+
+    def __call__(self, event: Event) -> None:
+        if self._mode == "compare" and self._extend_compare(event):
+            return
+        if self._mode == "insert" and self._extend_insert(event):
+            return
+        if self._mode is not None:
+            for pending in self._close():
+                self(pending)
+            self(event)
+            return
+        if _is_compare(event):
+            self._begin_compare(event)
+        else:
+            self._sink(event)
+
+    def flush(self) -> None:
+        while self._mode is not None:
+            for pending in self._close():
+                self(pending)
+
+    def _begin_compare(self, event: Event) -> None:
+        self._mode = "compare"
+        self._first = event
+        self._last = event
+        self._count = 1
+        self._delta = None
+
+    def _extend_compare(self, event: Event) -> bool:
+        first, last = self._first, self._last
+        assert first is not None and last is not None
+        if _is_shift_write(last, event):
+            # The last compare opens an insertion step; close the compares before it.
+            self._count -= 1
+            if self._count:
+                self._emit(self._compare_run())
+            self._mode = "insert"
+            self._first = last
+            self._last = event
+            self._start = last.indices[1]
+            self._step = last.indices[1] - last.indices[0]
+            self._steps = []
+            self._values = [event.value]
+            self._phase = "written"
+            self._partial = [last, event]
+            return True
+        if not _is_compare(event) or not _same_counters(
+            event, first, comparisons=self._count, writes=0
+        ):
+            return False
+        delta = (event.indices[0] - last.indices[0], event.indices[1] - last.indices[1])
+        if self._delta is None:
+            self._delta = delta
+        elif delta != self._delta:
+            return False
+        self._last = event
+        self._count += 1
+        return True
+
+    def _extend_insert(self, event: Event) -> bool:
+        last = self._last
+        assert last is not None
+        step = self._step
+        i = self._start + len(self._steps)
+        pos = i - len(self._values) * step
+        if self._phase == "compared":
+            # Either a shift or the held element landing at pos.
+            if not _is_write_at(event, pos, last):
+                return False
+            self._values.append(event.value)
+            self._phase = "written"
+        elif self._phase == "written" and pos >= step and _is_compare_at(event, pos, step, last):
+            self._phase = "compared"
+        elif self._phase == "written" and pos < step and _is_write_at(event, pos, last):
+            # No compare guards the bottom slot, so this write ends the step.
+            self._values.append(event.value)
+            self._phase = "done"
+        elif len(self._steps) + 1 < self._max_steps and _is_compare_at(event, i + 1, step, last):
+            self._steps.append(tuple(self._values))
+            self._values = []
+            self._partial = []
+            self._phase = "compared"
+        else:
+            return False
+        self._partial.append(event)
+        self._last = event
+        return True
+
+    def _compare_run(self) -> Event:
+        first = self._first
+        assert first is not None
+        di, dj = self._delta or (0, 0)
+        return Event(
+            kind="compare_run",
+            indices=(first.indices[0], first.indices[1], di, dj, self._count),
+            comparisons=first.comparisons,
+            swaps=first.swaps,
+            writes=first.writes,
+        )
+
+    def _insert_run(self) -> Event:
+        first = self._first
+        assert first is not None
+        return Event(
+            kind="insert_run",
+            indices=(self._start, self._step, self._count),
+            value=tuple(self._steps),
+            comparisons=first.comparisons,
+            swaps=first.swaps,
+            writes=first.writes,
+        )
+
+    def _emit(self, run: Event) -> None:
+        if self._count >= self._min_run:
+            self._sink(run)
+        else:
+            for event in expand_event(run):
+                self._sink(event)
+
+    def _close(self) -> List[Event]:
+        """Emit the open run and return the events of an unfinished step.
+
+        The caller feeds those back through the compressor. A run that did
+        not finish its first step forwards them raw instead, so nothing is
+        fed back twice.
+        """
+        pending: List[Event] = []
+        if self._mode == "compare":
+            self._emit(self._compare_run())
+        else:
+            if self._phase != "compared":
+                self._steps.append(tuple(self._values))
+                self._partial = []
+            self._count = len(self._steps)
+            if self._count:
+                self._emit(self._insert_run())
+                pending = self._partial
+            else:
+                for event in self._partial:
+                    self._sink(event)
+        self._mode = None
+        self._first = None
+        self._last = None
+        self._steps = []
+        self._values = []
+        self._partial = []
+        self._count = 0
+        return pending
+
+
+def compress(events: Iterable[Event], min_run: int = 2) -> List[Event]:
+    out: List[Event] = []
+    compressor = TraceCompressor(out.append, min_run=min_run)
+    for event in events:
+        compressor(event)
+    compressor.flush()
+    return out
+
+
+def _is_compare(event: Event) -> bool:
+    return (
+        event.kind == "compare"
+        and len(event.indices) == 2
+        and event.value is None
+        and event.label is None
+    )
+
+
+def _is_shift_write(compare: Event, event: Event) -> bool:
+    i, j = compare.indices
+    return (
+        event.kind == "write"
+        and j > i
+        and event.indices == (j,)
+        and event.label is None
+        and _same_counters(event, compare, comparisons=0, writes=1)
+    )
+
+
+def _is_compare_at(event: Event, pos: int, step: int, last: Event) -> bool:
+    return (
+        _is_compare(event)
+        and event.indices == (pos - step, pos)
+        and _same_counters(event, last, comparisons=1, writes=0)
+    )
+
+
+def _is_write_at(event: Event, pos: int, last: Event) -> bool:
+    return (
+        event.kind == "write"
+        and event.indices == (pos,)
+        and event.label is None
+        and _same_counters(event, last, comparisons=0, writes=1)
+    )
+
+
+def _same_counters(event: Event, first: Event, comparisons: int, writes: int) -> bool:
+    return (
+        event.comparisons == first.comparisons + comparisons
+        and event.writes == first.writes + writes
+        and event.swaps == first.swaps
+    )
+
+
+def record_trace(
+    sort_fn: Callable[..., Any],
+    data: List[Any],
+    sink: Callable[[Event], None],
+    sampler: Optional[Sampler] = None,
+    compress_runs: bool = True,
+    **kwargs: Any,
+) -> Instrumentation:
+    """Run ``sort_fn`` on ``data`` and forward its (sampled, compressed) trace to ``sink``.
+
+    Traces are meant to be replayed, so the sampler only thins out compares
+    and marks; every swap and write is kept (see :func:`keep_state`). A
+    :class:`ReservoirSampler` only knows its sample once the sort finishes,
+    so its events are forwarded at the end and are not compressed.
+    """
+    if sampler is not None:
+        sampler = keep_state(sampler)
+    if isinstance(sampler, ReservoirSampler):
+        inst = Instrumentation(event_sink=sampler, sampler=sampler)
+        sort_fn(data, inst, **kwargs)
+        for event in sampler.events:
+            sink(event)
+        return inst
+    if not compress_runs:
+        inst = Instrumentation(event_sink=sink, sampler=sampler)
+        sort_fn(data, inst, **kwargs)
+        return inst
+    compressor = TraceCompressor(sink)
+    inst = Instrumentation(event_sink=compressor, sampler=sampler)
+    sort_fn(data, inst, **kwargs)
+    compressor.flush()
+    return inst
@@ -1,16 +1,86 @@
 from __future__ import annotations
 
-from typing import Iterable, List
+import queue
+import threading
+from typing import Callable, Iterable, Iterator, List, Optional
 
 from instrumentation import Event
+from trace_compression import TraceReplay, expand_event
 
+BASE_COLOR = "#4C78A8"
+COMPARE_COLOR = "#F58518"
+SWAP_COLOR = "#E45756"
+WRITE_COLOR = "#54A24B"
+MARK_COLOR = "#9D755D"
 
-def visualize(
-    initial: List[int],
-    events: Iterable[Event],
-    speed: float = 1.0,
-    title: str | None = None,
-) -> None:
+
+class EventStream:
+    """Run a traced sort in a worker thread and hand its events over a bounded queue.
+
+    ``produce`` receives an event sink and should run the sort with it. The
+    worker blocks whenever ``maxsize`` events are waiting, so memory stays
+    constant however long the trace is. Iterating the stream yields events
+    as they arrive and re-raises any error from the worker.
+    """
+
+    _DONE = object()
+
+    def __init__(
+        self,
+        produce: Callable[[Callable[[Event], None]], None],
+        maxsize: int = 1024,
+    ) -> None:
+        self._produce = produce
+        self._queue: queue.Queue[object] = queue.Queue(maxsize=max(1, maxsize))
+        self._cancelled = threading.Event()
+        self._error: Optional[BaseException] = None
+        self._thread = threading.Thread(target=self._run, name="viz-producer", daemon=True)
+
+    def start(self) -> "EventStream":
+        self._thread.start()
+        return self
+
+    def close(self) -> None:
+        """Stop the producer, e.g. when the plot window is closed early."""
+        self._cancelled.set()
+        self._thread.join(timeout=1.0)
+
+    def _put(self, item: object) -> None:
+        while not self._cancelled.is_set():
+            try:
+                self._queue.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                continue
+        raise _Cancelled()
+
+    def _run(self) -> None:
+        try:
+            self._produce(self._put)
+        except _Cancelled:
+            return
+        except BaseException as exc:  # surfaced to the consumer
+            self._error = exc
+        try:
+            self._put(self._DONE)
+        except _Cancelled:
+            pass
+
+    def __iter__(self) -> Iterator[Event]:
+        while True:
+            item = self._queue.get()
+            if item is self._DONE:
+                if self._error is not None:
+                    raise self._error
+                return
+            yield item  # type: ignore[misc]
+
+
+class _Cancelled(Exception):
+    pass
+
+
+def _require_matplotlib():
     try:
         import matplotlib.pyplot as plt
         from matplotlib.animation import FuncAnimation
@@ -18,62 +88,112 @@ def visualize(
         raise SystemExit(
             "matplotlib is required for visualization. Install it with 'pip install matplotlib'."
         ) from exc
+    return plt, FuncAnimation
 
-    data = list(initial)
-    event_list = list(events)
-
-    base_color = "#4C78A8"
-    compare_color = "#F58518"
-    swap_color = "#E45756"
-    write_color = "#54A24B"
-    mark_color = "#9D755D"
 
+def _setup_figure(plt, initial: List[int], title: str | None):
+    data = list(initial)
     fig, ax = plt.subplots()
     ax.set_title(title or "Sorting Visualization")
-    bars = ax.bar(range(len(data)), data, color=base_color)
+    bars = ax.bar(range(len(data)), data, color=BASE_COLOR)
     ax.set_xlim(-0.5, max(len(data) - 0.5, 0.5))
     ymax = max(data) * 1.1 if data else 1
     ax.set_ylim(0, ymax)
     text = ax.text(0.02, 0.95, "", transform=ax.transAxes)
 
-    def update(frame: int):
-        event = event_list[frame]
+    def draw(event: Event):
         for bar in bars:
-            bar.set_color(base_color)
+            bar.set_color(BASE_COLOR)
 
         if event.kind == "compare":
             for idx in event.indices:
-                bars[idx].set_color(compare_color)
+                bars[idx].set_color(COMPARE_COLOR)
         elif event.kind == "swap":
             i, j = event.indices
             data[i], data[j] = data[j], data[i]
             bars[i].set_height(data[i])
             bars[j].set_height(data[j])
-            bars[i].set_color(swap_color)
-            bars[j].set_color(swap_color)
+            bars[i].set_color(SWAP_COLOR)
+            bars[j].set_color(SWAP_COLOR)
         elif event.kind == "write":
             idx = event.indices[0]
             data[idx] = event.value
             bars[idx].set_height(data[idx])
-            bars[idx].set_color(write_color)
+            bars[idx].set_color(WRITE_COLOR)
         elif event.kind == "mark":
             idx = event.indices[0]
-            bars[idx].set_color(mark_color)
+            bars[idx].set_color(MARK_COLOR)
 
         text.set_text(
             f"comparisons: {event.comparisons}  swaps: {event.swaps}  writes: {event.writes}"
         )
         return (*bars, text)
 
-    if not event_list:
+    return fig, bars, text, draw
+
+
+def _interval(speed: float) -> int:
+    return max(1, int(60 / max(speed, 0.1)))
+
+
+def visualize(
+    initial: List[int],
+    events: Iterable[Event],
+    speed: float = 1.0,
+    title: str | None = None,
+) -> None:
+    plt, FuncAnimation = _require_matplotlib()
+
+    # Compressed run events are expanded lazily, one frame at a time.
+    event_list = TraceReplay(events)
+    fig, _, text, draw = _setup_figure(plt, initial, title)
+
+    def update(frame: int):
+        return draw(event_list[frame])
+
+    if not len(event_list):
         text.set_text("No events to visualize")
         plt.show()
         return
 
-    interval = max(1, int(60 / max(speed, 0.1)))
     anim = FuncAnimation(
-        fig, update, frames=len(event_list), interval=interval, repeat=False
+        fig, update, frames=len(event_list), interval=_interval(speed), repeat=False
     )
     # Keep a reference so the animation isn't garbage collected before show().
     _ = anim
     plt.show()
+
+
+def visualize_stream(
+    initial: List[int],
+    stream: EventStream,
+    speed: float = 1.0,
+    title: str | None = None,
+) -> None:
+    """Animate events while the sort is still producing them.
+
+    Frames are pulled from ``stream`` on demand and nothing is cached, so
+    playback starts immediately and memory does not grow with the trace.
+    """
+    plt, FuncAnimation = _require_matplotlib()
+    fig, bars, text, draw = _setup_figure(plt, initial, title)
+
+    def frames() -> Iterator[Event]:
+        for event in stream:
+            yield from expand_event(event)
+
+    anim = FuncAnimation(
+        fig,
+        draw,
+        frames=frames,
+        init_func=lambda: (*bars, text),
+        interval=_interval(speed),
+        repeat=False,
+        cache_frame_data=False,
+    )
+    # Keep a reference so the animation isn't garbage collected before show().
+    _ = anim
+    try:
+        plt.show()
+    finally:
+        stream.close()